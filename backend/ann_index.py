@@ -0,0 +1,272 @@
+"""
+ANN Index - inverted-file (IVF) approximate nearest-neighbour search in NumPy
+Used by founder_index once the founder directory is too large to scan
+
+Vectors are clustered around k-means centroids; a query only scans the
+`nprobe` lists whose centroids are closest, so raising nprobe trades latency
+for recall (nprobe == n_lists is an exact search).
+
+Build offline from a .npy matrix of embeddings (one row per founder, in the
+directory's order); --founders stamps the fingerprint the server checks
+before reusing a saved index:
+    python ann_index.py build embeddings.npy founder_ann.npz --founders data/mock_founders.json --lists 1024
+"""
+
+import argparse
+import json
+import math
+import os
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+# Lists scanned per query unless the caller overrides it. When set in the
+# environment it also overrides the nprobe stored in a saved index.
+CONFIGURED_NPROBE = int(os.getenv("FOUNDER_ANN_NPROBE", "0")) or None
+DEFAULT_NPROBE = CONFIGURED_NPROBE or 8
+
+KMEANS_ITERATIONS = 10
+# Training points per centroid sampled for k-means
+TRAIN_POINTS_PER_LIST = 64
+# Rows assigned per matrix product while building, to bound peak memory
+ASSIGN_CHUNK_ROWS = 65536
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+def default_list_count(size: int) -> int:
+    """Rule-of-thumb list count: about 4 * sqrt(n)"""
+    return max(1, min(size, int(4 * math.sqrt(max(size, 1)))))
+
+
+class IVFIndex:
+    """
+    Cosine-similarity IVF index over unit vectors with integer ids.
+
+    Each inverted list keeps its own contiguous float32 block, so scanning a
+    list is one matrix-vector product and inserting only touches one list.
+    """
+
+    def __init__(self, centroids: np.ndarray, nprobe: int = DEFAULT_NPROBE):
+        self.centroids = _unit_rows(centroids)
+        self.nprobe = nprobe
+        dim = self.centroids.shape[1]
+        self._vectors: List[np.ndarray] = [np.empty((0, dim), dtype=np.float32) for _ in range(len(self.centroids))]
+        self._ids: List[np.ndarray] = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._ids)
+
+    @property
+    def dimensions(self) -> int:
+        return self.centroids.shape[1]
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    # --- building ---
+
+    @classmethod
+    def train(
+        cls,
+        vectors: np.ndarray,
+        n_lists: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE,
+        seed: int = 0
+    ) -> "IVFIndex":
+        """Fit centroids with spherical k-means on a sample of vectors"""
+        vectors = _unit_rows(vectors)
+        n_lists = n_lists or default_list_count(len(vectors))
+        if len(vectors) < n_lists:
+            raise ValueError(f"Need at least {n_lists} vectors to train {n_lists} lists")
+
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), n_lists * TRAIN_POINTS_PER_LIST)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, n_lists, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            empty = ~sums.any(axis=1)
+            # Re-seed empty clusters from random sample points
+            sums[empty] = sample[rng.choice(sample_size, int(empty.sum()))]
+            centroids = _unit_rows(sums)
+
+        return cls(centroids, nprobe=nprobe)
+
+    @classmethod
+    def build(
+        cls,
+        vectors: np.ndarray,
+        ids: Optional[np.ndarray] = None,
+        n_lists: Optional[int] = None,
+        nprobe: int = DEFAULT_NPROBE
+    ) -> "IVFIndex":
+        """Train on vectors and insert all of them (ids default to row numbers)"""
+        index = cls.train(vectors, n_lists=n_lists, nprobe=nprobe)
+        index.add(np.arange(len(vectors)) if ids is None else ids, vectors)
+        return index
+
+    def add(self, ids, vectors: np.ndarray) -> None:
+        """Insert vectors under the given ids into their nearest lists"""
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        vectors = _unit_rows(np.atleast_2d(vectors))
+        if len(ids) != len(vectors):
+            raise ValueError("ids and vectors must have the same length")
+
+        for start in range(0, len(vectors), ASSIGN_CHUNK_ROWS):
+            chunk = vectors[start:start + ASSIGN_CHUNK_ROWS]
+            chunk_ids = ids[start:start + ASSIGN_CHUNK_ROWS]
+            assignment = np.argmax(chunk @ self.centroids.T, axis=1)
+            for list_no in np.unique(assignment):
+                members = assignment == list_no
+                self._vectors[list_no] = np.concatenate([self._vectors[list_no], chunk[members]])
+                self._ids[list_no] = np.concatenate([self._ids[list_no], chunk_ids[members]])
+
+    def _locate(self, id_: int, vector: np.ndarray) -> Tuple[int, int]:
+        """(list, position) of id, checking the list its vector maps to first"""
+        guess = int(np.argmax(self.centroids @ _unit_rows(np.atleast_2d(vector))[0]))
+        for list_no in [guess, *range(self.n_lists)]:
+            positions = np.flatnonzero(self._ids[list_no] == id_)
+            if len(positions):
+                return list_no, int(positions[0])
+        raise KeyError(id_)
+
+    def remove(self, id_: int, vector: np.ndarray) -> None:
+        """Delete the entry for id (vector is its embedding, used to find its list)"""
+        list_no, position = self._locate(id_, vector)
+        self._vectors[list_no] = np.delete(self._vectors[list_no], position, axis=0)
+        self._ids[list_no] = np.delete(self._ids[list_no], position)
+
+    def relabel(self, old_id: int, new_id: int, vector: np.ndarray) -> None:
+        """Give the entry stored under old_id a new id"""
+        list_no, position = self._locate(old_id, vector)
+        self._ids[list_no][position] = new_id
+
+    # --- querying ---
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        allowed: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        bonus: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (ids, scores) of up to k nearest vectors, best first
+
+        Args:
+            nprobe: Lists to scan (defaults to self.nprobe); higher is slower
+                but closer to exact
+            allowed: Optional function from candidate ids to a keep mask
+            bonus: Optional function from candidate ids to amounts added to
+                their similarities
+            Both only see the ids in the probed lists.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0 or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        query = query / norm
+
+        nprobe = max(1, min(nprobe or self.nprobe, self.n_lists))
+        centroid_scores = self.centroids @ query
+        probes = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe] if nprobe < self.n_lists else range(self.n_lists)
+
+        scores = [self._vectors[list_no] @ query for list_no in probes]
+        ids = [self._ids[list_no] for list_no in probes]
+        if not scores:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        scores = np.concatenate(scores)
+        ids = np.concatenate(ids)
+        if allowed is not None:
+            keep = allowed(ids)
+            scores, ids = scores[keep], ids[keep]
+        if bonus is not None:
+            scores = scores + bonus(ids)
+        if not len(scores):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        if k < len(scores):
+            best = np.argpartition(-scores, k - 1)[:k]
+        else:
+            best = np.arange(len(scores))
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return ids[best], scores[best]
+
+    # --- persistence ---
+
+    def save(self, path: str, fingerprint: str = "") -> None:
+        """Write the index to a single .npz file"""
+        sizes = np.array([len(ids) for ids in self._ids], dtype=np.int64)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            centroids=self.centroids,
+            vectors=np.concatenate(self._vectors) if len(self) else np.empty((0, self.dimensions), dtype=np.float32),
+            ids=np.concatenate(self._ids) if len(self) else np.empty(0, dtype=np.int64),
+            sizes=sizes,
+            nprobe=np.array(self.nprobe),
+            fingerprint=np.array(fingerprint)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, nprobe: Optional[int] = None) -> Tuple["IVFIndex", str]:
+        """
+        Read an index written by save(); returns (index, fingerprint)
+
+        nprobe, else FOUNDER_ANN_NPROBE, else the value saved with the index
+        """
+        with np.load(path) as data:
+            index = cls(data["centroids"], nprobe=int(nprobe or CONFIGURED_NPROBE or data["nprobe"]))
+            offsets = np.cumsum(data["sizes"])[:-1]
+            index._vectors = [block.copy() for block in np.split(data["vectors"], offsets)]
+            index._ids = [block.copy() for block in np.split(data["ids"], offsets)]
+            return index, str(data["fingerprint"])
+
+
+def _main() -> None:
+    parser = argparse.ArgumentParser(description="Build an IVF index from a .npy embedding matrix")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build")
+    build.add_argument("embeddings", help=".npy float32 matrix, one row per founder")
+    build.add_argument("output", help="Destination .npz")
+    build.add_argument("--lists", type=int, default=None, help="Inverted lists (default ~4*sqrt(n))")
+    build.add_argument("--nprobe", type=int, default=DEFAULT_NPROBE)
+    build.add_argument(
+        "--founders",
+        help="Founder directory JSON the embeddings were computed from; without it the server won't reuse the index"
+    )
+    args = parser.parse_args()
+
+    vectors = np.load(args.embeddings, mmap_mode="r")
+    fingerprint = ""
+    if args.founders:
+        # Imported here: founder_index depends on this module
+        from embedding_service import EMBEDDING_MODEL
+        from founder_index import founder_keys, directory_fingerprint
+
+        with open(args.founders, "r", encoding="utf-8") as fh:
+            founders = json.load(fh)
+        if len(founders) != len(vectors):
+            parser.error(f"{args.founders} has {len(founders)} founders but {args.embeddings} has {len(vectors)} rows")
+        _, keys = founder_keys(founders, EMBEDDING_MODEL)
+        fingerprint = directory_fingerprint(keys)
+
+    index = IVFIndex.build(vectors, n_lists=args.lists, nprobe=args.nprobe)
+    index.save(args.output, fingerprint=fingerprint)
+    print(f"✅ Built IVF index: {len(index)} vectors in {index.n_lists} lists → {args.output}")
+
+
+if __name__ == "__main__":
+    _main()
@@ -4,13 +4,77 @@ SQLite database with async support via aiosqlite
 """
 
 import aiosqlite
+import json
 import os
+import time
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
 DATABASE_PATH = Path(__file__).parent / "hatchr.db"
 
+# Schema of the job/project store and the enrichment cache, tracked with
+# PRAGMA user_version. Each entry upgrades from (version - 1) to version.
+SCHEMA_MIGRATIONS: Dict[int, List[str]] = {
+    1: [
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            progress INTEGER NOT NULL DEFAULT 0,
+            steps TEXT NOT NULL,
+            project_id TEXT,
+            project_name TEXT,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS job_logs (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            message TEXT NOT NULL,
+            type TEXT NOT NULL,
+            FOREIGN KEY (job_id) REFERENCES jobs (job_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS projects (
+            project_id TEXT PRIMARY KEY,
+            job_id TEXT,
+            project_name TEXT NOT NULL,
+            live_url TEXT,
+            data TEXT NOT NULL,
+            created_at TEXT NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_job_logs_job_seq ON job_logs(job_id, seq)",
+        "CREATE INDEX IF NOT EXISTS idx_projects_created_at ON projects(created_at)",
+    ],
+    2: [
+        """
+        CREATE TABLE IF NOT EXISTS enrichment_cache (
+            cache_key TEXT PRIMARY KEY,
+            spec TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_enrichment_cache_last_used ON enrichment_cache(last_used_at)",
+    ],
+    3: [
+        # float32 idea embedding for the semantic (near-duplicate) lookup
+        "ALTER TABLE enrichment_cache ADD COLUMN embedding BLOB",
+    ],
+    4: [
+        # "<host>:<pid>" of the process running the job, to spot orphans after a restart
+        "ALTER TABLE jobs ADD COLUMN owner TEXT",
+    ],
+}
+SCHEMA_VERSION = max(SCHEMA_MIGRATIONS)
+
 
 async def init_database():
     """Initialize database and create tables if they don't exist"""
@@ -54,9 +118,37 @@ async def init_database():
         """)
 
         await db.commit()
+
+        await _migrate_schema(db)
         print(f"✅ Database initialized at {DATABASE_PATH}")
 
 
+async def _migrate_schema(db: aiosqlite.Connection) -> None:
+    """Bring the job store and cache tables up to SCHEMA_VERSION"""
+    # WAL lets several uvicorn workers read job status while one writes
+    await db.execute("PRAGMA journal_mode=WAL")
+
+    # Check and upgrade under one write lock: ALTER TABLE ADD COLUMN isn't
+    # idempotent, so two workers starting together must not both apply it
+    await db.execute("BEGIN IMMEDIATE")
+    try:
+        async with db.execute("PRAGMA user_version") as cursor:
+            row = await cursor.fetchone()
+            current_version = row[0] if row else 0
+
+        for version in range(current_version + 1, SCHEMA_VERSION + 1):
+            for statement in SCHEMA_MIGRATIONS[version]:
+                await db.execute(statement)
+            await db.execute(f"PRAGMA user_version = {version}")
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+
+    if current_version < SCHEMA_VERSION:
+        print(f"   Schema migrated from v{current_version} to v{SCHEMA_VERSION}")
+
+
 async def get_user_by_wallet(wallet_address: str) -> Optional[Dict[str, Any]]:
     """Get user by Concordium wallet address"""
     async with aiosqlite.connect(DATABASE_PATH) as db:
@@ -188,3 +280,285 @@ async def cleanup_expired_sessions() -> int:
         )
         await db.commit()
         return cursor.rowcount
+
+
+# === JOB / PROJECT STORE ===
+
+async def create_job_record(
+    job_id: str,
+    steps: List[Dict[str, Any]],
+    initial_log: Optional[Dict[str, str]] = None,
+    status: str = "processing",
+    owner: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create a generation job with its step list and optional first log entry"""
+    now = datetime.utcnow().isoformat()
+
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """
+            INSERT INTO jobs (job_id, status, progress, steps, owner, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, status, 0, json.dumps(steps), owner, now, now)
+        )
+        if initial_log:
+            await db.execute(
+                "INSERT INTO job_logs (job_id, timestamp, message, type) VALUES (?, ?, ?, ?)",
+                (job_id, initial_log["timestamp"], initial_log["message"], initial_log["type"])
+            )
+        await db.commit()
+
+    return {
+        "job_id": job_id,
+        "status": status,
+        "progress": 0,
+        "steps": steps,
+        "project_id": None,
+        "project_name": None,
+        "created_at": now
+    }
+
+
+async def get_job_record(job_id: str, since_seq: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get a job with its steps and log entries
+
+    Args:
+        job_id: Job identifier
+        since_seq: Only return log entries with seq greater than this cursor
+                   (None returns the full log list)
+    """
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT * FROM jobs WHERE job_id = ?",
+            (job_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+            if not row:
+                return None
+            job = dict(row)
+
+        async with db.execute(
+            """
+            SELECT seq, timestamp, message, type FROM job_logs
+            WHERE job_id = ? AND seq > ?
+            ORDER BY seq
+            """,
+            (job_id, since_seq or 0)
+        ) as cursor:
+            job["logs"] = [dict(log) for log in await cursor.fetchall()]
+
+    job["steps"] = json.loads(job["steps"])
+    return job
+
+
+async def job_exists(job_id: str) -> bool:
+    """Whether a job record exists (without loading its logs)"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db.execute("SELECT 1 FROM jobs WHERE job_id = ?", (job_id,)) as cursor:
+            return await cursor.fetchone() is not None
+
+
+async def list_unfinished_jobs() -> List[Tuple[str, Optional[str]]]:
+    """(job_id, owner) of every job still queued or processing"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db.execute(
+            "SELECT job_id, owner FROM jobs WHERE status IN ('queued', 'processing')"
+        ) as cursor:
+            return [(row[0], row[1]) for row in await cursor.fetchall()]
+
+
+async def update_job_record(job_id: str, **fields: Any) -> None:
+    """Update status, progress, project_id and/or project_name of a job"""
+    allowed = {"status", "progress", "project_id", "project_name"}
+    unknown = set(fields) - allowed
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+    if not fields:
+        return
+
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    values = list(fields.values()) + [datetime.utcnow().isoformat(), job_id]
+
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            f"UPDATE jobs SET {assignments}, updated_at = ? WHERE job_id = ?",
+            values
+        )
+        await db.commit()
+
+
+async def update_job_step(job_id: str, step_index: int, status: str) -> None:
+    """Set the status of one step in place (atomic, no read-modify-write)"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """
+            UPDATE jobs
+            SET steps = json_set(steps, '$[' || ? || '].status', ?), updated_at = ?
+            WHERE job_id = ?
+            """,
+            (step_index, status, datetime.utcnow().isoformat(), job_id)
+        )
+        await db.commit()
+
+
+async def append_job_log(job_id: str, message: str, log_type: str = "info") -> Optional[Dict[str, Any]]:
+    """Append a log entry to a job, returning it as stored (seq, timestamp, message, type)"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute(
+            """
+            INSERT INTO job_logs (job_id, timestamp, message, type)
+            SELECT ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM jobs WHERE job_id = ?)
+            """,
+            (job_id, timestamp, message, log_type, job_id)
+        )
+        await db.commit()
+        if not cursor.rowcount:
+            return None
+        return {"seq": cursor.lastrowid, "timestamp": timestamp, "message": message, "type": log_type}
+
+
+async def create_project_record(project: Dict[str, Any], job_id: Optional[str] = None) -> None:
+    """Store a finished project (full payload kept as JSON)"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO projects (project_id, job_id, project_name, live_url, data, created_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                project["project_id"],
+                job_id,
+                project["project_name"],
+                project.get("live_url"),
+                json.dumps(project, default=str),
+                project["created_at"]
+            )
+        )
+        await db.commit()
+
+
+async def get_project_record(project_id: str) -> Optional[Dict[str, Any]]:
+    """Get the full stored payload of a project"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db.execute(
+            "SELECT data FROM projects WHERE project_id = ?",
+            (project_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+            if row:
+                return json.loads(row[0])
+            return None
+
+
+async def list_project_records() -> List[Dict[str, Any]]:
+    """List project summaries in creation order"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """
+            SELECT project_id, project_name, live_url, created_at
+            FROM projects
+            ORDER BY created_at
+            """
+        ) as cursor:
+            return [dict(row) for row in await cursor.fetchall()]
+
+
+# === ENRICHMENT CACHE ===
+
+async def get_cached_enrichment(cache_key: str, max_age_seconds: float) -> Optional[Dict[str, Any]]:
+    """Get a cached GPT-4o spec younger than max_age_seconds, marking it recently used"""
+    now = time.time()
+
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db.execute(
+            "SELECT spec FROM enrichment_cache WHERE cache_key = ? AND created_at >= ?",
+            (cache_key, now - max_age_seconds)
+        ) as cursor:
+            row = await cursor.fetchone()
+            if not row:
+                return None
+
+        await db.execute(
+            "UPDATE enrichment_cache SET last_used_at = ? WHERE cache_key = ?",
+            (now, cache_key)
+        )
+        await db.commit()
+        return json.loads(row[0])
+
+
+async def store_cached_enrichment(
+    cache_key: str,
+    spec: Dict[str, Any],
+    max_entries: int,
+    embedding: Optional[bytes] = None
+) -> None:
+    """Store a GPT-4o spec, evicting least recently used entries beyond max_entries"""
+    now = time.time()
+
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO enrichment_cache (cache_key, spec, created_at, last_used_at, embedding)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (cache_key, json.dumps(spec), now, now, embedding)
+        )
+        await _evict_enrichment_cache(db, max_entries)
+        await db.commit()
+
+
+async def alias_cached_enrichment(
+    cache_key: str,
+    source_key: str,
+    max_entries: int,
+    embedding: Optional[bytes] = None
+) -> None:
+    """
+    Store source_key's spec under cache_key as well
+
+    The alias keeps the source's created_at, so it expires with the spec it
+    copies instead of extending its lifetime.
+    """
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            """
+            INSERT OR REPLACE INTO enrichment_cache (cache_key, spec, created_at, last_used_at, embedding)
+            SELECT ?, spec, created_at, ?, ? FROM enrichment_cache WHERE cache_key = ?
+            """,
+            (cache_key, time.time(), embedding, source_key)
+        )
+        await _evict_enrichment_cache(db, max_entries)
+        await db.commit()
+
+
+async def _evict_enrichment_cache(db: aiosqlite.Connection, max_entries: int) -> None:
+    """Drop least recently used cached specs beyond max_entries"""
+    await db.execute(
+        """
+        DELETE FROM enrichment_cache WHERE cache_key IN (
+            SELECT cache_key FROM enrichment_cache
+            ORDER BY last_used_at DESC
+            LIMIT -1 OFFSET ?
+        )
+        """,
+        (max_entries,)
+    )
+
+
+async def list_enrichment_embeddings(max_age_seconds: float) -> List[Tuple[str, bytes]]:
+    """Get (cache_key, embedding) for every unexpired cached spec that has an embedding"""
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        async with db.execute(
+            """
+            SELECT cache_key, embedding FROM enrichment_cache
+            WHERE embedding IS NOT NULL AND created_at >= ?
+            """,
+            (time.time() - max_age_seconds,)
+        ) as cursor:
+            return [(row[0], row[1]) for row in await cursor.fetchall()]
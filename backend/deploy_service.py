@@ -9,6 +9,8 @@ from typing import Dict, Optional
 import requests
 from dotenv import load_dotenv
 
+from provider_limits import get_limiter
+
 load_dotenv()
 
 RENDER_API_KEY = os.getenv("RENDER_API_KEY", "")
@@ -78,9 +80,10 @@ class RenderDeployer:
         print(f"   Plan: Free")
 
         try:
-            response = requests.post(
-                f"{RENDER_API_URL}/services", json=payload, headers=headers, timeout=30
-            )
+            with get_limiter("render"):
+                response = requests.post(
+                    f"{RENDER_API_URL}/services", json=payload, headers=headers, timeout=30
+                )
 
             response.raise_for_status()
             result = response.json()
@@ -144,9 +147,10 @@ class RenderDeployer:
         headers = {"Authorization": f"Bearer {RENDER_API_KEY}"}
 
         try:
-            response = requests.get(
-                f"{RENDER_API_URL}/services/{service_id}", headers=headers, timeout=10
-            )
+            with get_limiter("render"):
+                response = requests.get(
+                    f"{RENDER_API_URL}/services/{service_id}", headers=headers, timeout=10
+                )
 
             response.raise_for_status()
             result = response.json()
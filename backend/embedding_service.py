@@ -0,0 +1,307 @@
+"""
+Embedding Service - shared text-embedding-3-small helpers
+Used by the semantic enrichment cache and the cofounder matcher
+
+embed_text() memoizes by normalized text: an in-process LRU in front of an
+optional on-disk EmbeddingStore (EMBEDDING_CACHE_PATH). New embeddings and
+cache hits are buffered and written to disk in batches off the event loop.
+"""
+
+import os
+import re
+import asyncio
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+
+from provider_limits import get_limiter
+from ttl_cache import TTLCache
+from embedding_store import EmbeddingStore, text_hash
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Batched embedding: texts per request and requests in flight at once
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_MAX_PARALLEL_BATCHES = int(os.getenv("EMBEDDING_MAX_PARALLEL_BATCHES", "4"))
+# Hard cap on inputs per embeddings request
+MAX_INPUTS_PER_REQUEST = 2048
+
+# embed_text() memo: in-process LRU, plus an on-disk tier when a path is set
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "4096"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+EMBEDDING_CACHE_DISK_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_DISK_MAX_ENTRIES", "20000"))
+# Disk writes are batched: flushed once this many embeddings are buffered,
+# or this many seconds after the first one
+EMBEDDING_CACHE_FLUSH_SIZE = int(os.getenv("EMBEDDING_CACHE_FLUSH_SIZE", "64"))
+EMBEDDING_CACHE_FLUSH_SECONDS = float(os.getenv("EMBEDDING_CACHE_FLUSH_SECONDS", "5"))
+
+_openai_client: Optional[AsyncOpenAI] = None
+_memory_cache = TTLCache(EMBEDDING_CACHE_MAX_ENTRIES)
+_disk_cache: Optional[EmbeddingStore] = None
+_disk_lock = asyncio.Lock()
+# Not yet on disk: new embeddings, and keys used since the last flush (in use order)
+_disk_pending: Dict[str, np.ndarray] = {}
+_disk_touched: Dict[str, None] = {}
+_disk_flush_due = asyncio.Event()
+_disk_flush_task: Optional[asyncio.Task] = None
+_cache_counters = {"disk_hits": 0, "api_calls": 0}
+
+
+def get_embedding_client() -> AsyncOpenAI:
+    """Lazily create the shared async OpenAI client used for embeddings"""
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY if OPENAI_API_KEY else None)
+    return _openai_client
+
+
+def normalize_vector(vector) -> np.ndarray:
+    """Return a float32 unit vector (zero vectors are returned unchanged)"""
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    return array / norm if norm else array
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form of text before embedding: NFKC, single spaces, trimmed"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def _get_disk_cache() -> Optional[EmbeddingStore]:
+    """Open the on-disk embedding cache once, if EMBEDDING_CACHE_PATH is set"""
+    global _disk_cache
+    if _disk_cache is None and EMBEDDING_CACHE_PATH:
+        _disk_cache = EmbeddingStore(EMBEDDING_CACHE_PATH, EMBEDDING_MODEL)
+    return _disk_cache
+
+
+def _touch_disk_entry(key: str) -> None:
+    """Record a cache hit so disk eviction keeps recently used embeddings"""
+    if EMBEDDING_CACHE_PATH:
+        _disk_touched.pop(key, None)
+        _disk_touched[key] = None
+        _schedule_disk_flush()
+
+
+def _persist_embeddings(store: EmbeddingStore, pending: Dict[str, np.ndarray], touched: List[str]) -> None:
+    """Append a batch of embeddings, dropping the least recently used half once the store is full"""
+    store.touch(touched)
+    if not pending:
+        return
+    store.put_many(list(pending), np.stack(list(pending.values())))
+    if len(store) > EMBEDDING_CACHE_DISK_MAX_ENTRIES:
+        store.compact(store.keys()[-(EMBEDDING_CACHE_DISK_MAX_ENTRIES // 2):])
+
+
+async def flush_disk_cache() -> None:
+    """Write buffered embeddings and cache-hit order to the disk cache in one batch"""
+    _disk_flush_due.clear()
+    if not _disk_pending and not _disk_touched:
+        return
+    pending = dict(_disk_pending)
+    touched = list(_disk_touched)
+    _disk_pending.clear()
+    _disk_touched.clear()
+    try:
+        store = _get_disk_cache()
+        if store is None:
+            return
+        # Lookups wait on the lock, so they see these rows once pending is cleared
+        async with _disk_lock:
+            await asyncio.to_thread(_persist_embeddings, store, pending, touched)
+    except Exception as e:
+        # Runs unattended in a background task: a failed batch is dropped, not raised
+        print(f"⚠️  Could not persist embeddings to disk cache: {e}")
+
+
+async def _flush_disk_cache_later() -> None:
+    # Keeps going while embeddings or hits arrived during the previous write
+    while _disk_pending or _disk_touched:
+        try:
+            await asyncio.wait_for(_disk_flush_due.wait(), EMBEDDING_CACHE_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        await flush_disk_cache()
+
+
+def _schedule_disk_flush() -> None:
+    """Start the background flush unless one is already waiting"""
+    global _disk_flush_task
+    if _disk_flush_task is None or _disk_flush_task.done():
+        _disk_flush_task = asyncio.create_task(_flush_disk_cache_later())
+
+
+def _buffer_embedding(key: str, embedding: np.ndarray) -> None:
+    """Queue a new embedding for the next disk flush"""
+    _disk_pending[key] = embedding
+    if len(_disk_pending) >= EMBEDDING_CACHE_FLUSH_SIZE:
+        _disk_flush_due.set()
+    _schedule_disk_flush()
+
+
+async def embed_text(text: str, use_cache: bool = True) -> np.ndarray:
+    """
+    Embed one piece of text, returning a read-only float32 unit vector
+
+    Identical text (after normalize_text) is served from the memory cache,
+    then the disk cache, before calling the embeddings API.
+    """
+    text = normalize_text(text)
+    key = text_hash(text, EMBEDDING_MODEL)
+    if use_cache:
+        cached = _memory_cache.get(key)
+        if cached is None:
+            cached = _disk_pending.get(key)
+        if cached is not None:
+            _touch_disk_entry(key)
+            return cached
+
+        store = _get_disk_cache()
+        if store is not None:
+            async with _disk_lock:
+                cached = store.get(key)
+            if cached is not None:
+                _cache_counters["disk_hits"] += 1
+                cached.setflags(write=False)
+                _memory_cache.set(key, cached)
+                _touch_disk_entry(key)
+                return cached
+
+    async with get_limiter("openai"):
+        response = await get_embedding_client().embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=text
+        )
+    _cache_counters["api_calls"] += 1
+    embedding = normalize_vector(response.data[0].embedding)
+    embedding.setflags(write=False)
+
+    if use_cache:
+        _memory_cache.set(key, embedding)
+        if _get_disk_cache() is not None:
+            _buffer_embedding(key, embedding)
+    return embedding
+
+
+def cache_stats() -> Dict[str, Any]:
+    """embed_text() cache counters"""
+    store = _get_disk_cache()
+    return {
+        **_memory_cache.stats(),
+        **_cache_counters,
+        "disk_entries": len(store) if store is not None else None,
+        "disk_pending": len(_disk_pending)
+    }
+
+
+async def embed_texts(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    max_parallel: Optional[int] = None
+) -> np.ndarray:
+    """
+    Embed many texts with batched requests, at most max_parallel in flight
+
+    Returns:
+        float32 matrix of unit vectors, one row per text in input order
+    """
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)
+
+    batch_size = max(1, min(batch_size or EMBEDDING_BATCH_SIZE, MAX_INPUTS_PER_REQUEST))
+    in_flight = asyncio.Semaphore(max_parallel or EMBEDDING_MAX_PARALLEL_BATCHES)
+    client = get_embedding_client()
+
+    async def embed_batch(start: int) -> np.ndarray:
+        async with in_flight:
+            async with get_limiter("openai"):
+                response = await client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=texts[start:start + batch_size]
+                )
+        # The API tags each result with its input position
+        ordered = sorted(response.data, key=lambda item: item.index)
+        return np.asarray([item.embedding for item in ordered], dtype=np.float32)
+
+    batches = await asyncio.gather(*(embed_batch(start) for start in range(0, len(texts), batch_size)))
+    matrix = np.concatenate(batches)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+class VectorIndex:
+    """
+    Exact in-memory cosine index over unit vectors.
+
+    Rows live in one contiguous float32 matrix so a lookup is a single
+    matrix-vector product; removal swaps the last row into the hole. The
+    backing buffer doubles when full, so inserts are amortized O(1).
+    """
+
+    def __init__(self, dimensions: Optional[int] = None):
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._buffer = np.empty((0, dimensions or 0), dtype=np.float32)
+
+    @property
+    def _matrix(self) -> np.ndarray:
+        return self._buffer[:len(self._keys)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def add(self, key: str, vector) -> None:
+        """Insert or replace the vector stored under key"""
+        vector = normalize_vector(vector)
+        if not self._keys and vector.shape[0] != self._buffer.shape[1]:
+            self._buffer = np.empty((0, vector.shape[0]), dtype=np.float32)
+        if vector.shape[0] != self._buffer.shape[1]:
+            raise ValueError(f"Expected {self._buffer.shape[1]} dimensions, got {vector.shape[0]}")
+
+        if key in self._rows:
+            self._buffer[self._rows[key]] = vector
+            return
+
+        row = len(self._keys)
+        if row == len(self._buffer):
+            grown = np.empty((max(16, 2 * len(self._buffer)), self._buffer.shape[1]), dtype=np.float32)
+            grown[:row] = self._buffer
+            self._buffer = grown
+        self._buffer[row] = vector
+        self._rows[key] = row
+        self._keys.append(key)
+
+    def remove(self, key: str) -> None:
+        """Drop key from the index if present"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+            self._buffer[row] = self._buffer[last]
+        self._keys.pop()
+
+    def nearest(self, vector) -> Optional[Tuple[str, float]]:
+        """Return (key, cosine similarity) of the closest stored vector"""
+        if not self._keys:
+            return None
+        vector = normalize_vector(vector)
+        if vector.shape[0] != self._buffer.shape[1]:
+            return None
+        scores = self._matrix @ vector
+        best = int(np.argmax(scores))
+        return self._keys[best], float(scores[best])
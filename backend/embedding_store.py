@@ -0,0 +1,272 @@
+"""
+Embedding Store - persistent memory-mapped float32 embeddings keyed by text hash
+Lets founder indexing skip the embeddings API for profiles it has seen before
+
+Layout for a store at <path>:
+    <path>.f32      raw float32 rows, appended to as new texts are embedded
+    <path>.<n>.f32  the same after the n-th compaction
+    <path>.json     sidecar {"model", "dimensions", "generation",
+                    "rows": {text_hash: row}}, least recently used first
+    <path>.log      "<text_hash> <row>" lines appended since the sidecar was
+    <path>.<n>.log  written (stores and touches, replayed in order on load)
+
+Rows are written before the log lines that reference them, and compaction
+writes a new generation's data file before switching the sidecar to it, so
+a crash can only leave unreferenced rows, a torn last log line or stale
+files behind, never a reference to the wrong row. Appends first cut off any
+torn row a crash left at the end of the data file.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Rewrite the file once more than this share of rows is no longer referenced
+COMPACT_STALE_RATIO = 0.5
+# Fold the log into the sidecar once it has more lines than this and than
+# there are rows, keeping both the log and the rewrites amortized O(1) per row
+LOG_FOLD_MIN_LINES = 1024
+
+
+def text_hash(text: str, model: str) -> str:
+    """Key of one text's embedding (model-specific)"""
+    return hashlib.sha256(f"{model}\n{text}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingStore:
+    """Append-only on-disk matrix of unit float32 embeddings with a hash → row sidecar"""
+
+    def __init__(self, path: str, model: str):
+        self.path = path
+        self.model = model
+        self.dimensions: Optional[int] = None
+        self.generation = 0
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._log_lines = 0
+        self._load()
+
+    def _data_file(self, generation: int) -> str:
+        return f"{self.path}.f32" if generation == 0 else f"{self.path}.{generation}.f32"
+
+    def _log_file(self, generation: int) -> str:
+        return f"{self.path}.log" if generation == 0 else f"{self.path}.{generation}.log"
+
+    @property
+    def _data_path(self) -> str:
+        return self._data_file(self.generation)
+
+    @property
+    def _log_path(self) -> str:
+        return self._log_file(self.generation)
+
+    @property
+    def _index_path(self) -> str:
+        return f"{self.path}.json"
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def keys(self) -> List[str]:
+        """Stored keys, least recently stored or touched first"""
+        return list(self._rows)
+
+    def touch(self, keys: Iterable[str]) -> None:
+        """Mark keys as just used (logged, so the order survives a restart)"""
+        touched = []
+        for key in keys:
+            row = self._rows.pop(key, None)
+            if row is not None:
+                self._rows[key] = row
+                touched.append(key)
+        if touched and self.dimensions is not None:
+            self._append_log(touched)
+
+    # --- loading ---
+
+    def _load(self) -> None:
+        if not os.path.exists(self._index_path):
+            return
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as fh:
+                sidecar = json.load(fh)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Embedding store sidecar unreadable, starting empty: {e}")
+            return
+
+        if sidecar.get("model") != self.model:
+            print(f"♻️  Embedding store was built with {sidecar.get('model')}, re-embedding for {self.model}")
+            return
+
+        self.generation = int(sidecar.get("generation", 0))
+        if not os.path.exists(self._data_path):
+            self.generation = 0
+            return
+        self.dimensions = int(sidecar["dimensions"])
+        self._rows = {key: int(row) for key, row in sidecar["rows"].items()}
+        self._replay_log()
+        self._remap()
+
+    def _replay_log(self) -> None:
+        """Apply log lines written after the sidecar (a torn last line is skipped)"""
+        try:
+            with open(self._log_path, "rb") as fh:
+                data = fh.read()
+        except FileNotFoundError:
+            return
+        # Only newline-terminated lines were completely written; cut a torn
+        # tail off so the next append starts on a fresh line
+        complete = data.rfind(b"\n") + 1
+        if complete < len(data):
+            with open(self._log_path, "r+b") as fh:
+                fh.truncate(complete)
+        lines = data[:complete].decode("utf-8", errors="replace").split("\n")
+        for line in lines[:-1]:
+            parts = line.split(" ")
+            if len(parts) != 2 or not parts[1].isdigit():
+                continue
+            self._rows.pop(parts[0], None)
+            self._rows[parts[0]] = int(parts[1])
+        self._log_lines = len(lines) - 1
+
+    def _remap(self) -> None:
+        """Re-open the data file after it has grown"""
+        if not self.dimensions or not os.path.exists(self._data_path):
+            self._matrix = None
+            return
+        row_count = os.path.getsize(self._data_path) // (4 * self.dimensions)
+        if row_count == 0:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(self._data_path, dtype=np.float32, mode="r", shape=(row_count, self.dimensions))
+
+    # --- reading ---
+
+    def missing(self, keys: Iterable[str]) -> List[str]:
+        """Keys with no stored embedding (order preserved, duplicates dropped)"""
+        seen = set()
+        result = []
+        for key in keys:
+            if key not in self._rows and key not in seen:
+                seen.add(key)
+                result.append(key)
+        return result
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """One stored embedding (a copy), or None"""
+        row = self._rows.get(key)
+        if row is None or self._matrix is None:
+            return None
+        return np.array(self._matrix[row])
+
+    def gather(self, keys: List[str]) -> np.ndarray:
+        """Stored embeddings for keys as an in-memory (len(keys), dimensions) matrix"""
+        if self._matrix is None:
+            raise KeyError("Embedding store is empty")
+        rows = np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+        return np.asarray(self._matrix[rows])
+
+    # --- writing ---
+
+    def put_many(self, keys: List[str], vectors: np.ndarray) -> None:
+        """Append embeddings for keys and log them"""
+        if not keys:
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(len(keys), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        vectors = vectors / norms
+
+        new_store = self.dimensions is None
+        if new_store:
+            self.dimensions = vectors.shape[1]
+            # Left over from a store for another model
+            for stale in (self._data_path, self._log_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+        elif vectors.shape[1] != self.dimensions:
+            raise ValueError(f"Expected {self.dimensions} dimensions, got {vectors.shape[1]}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(self._data_path)), exist_ok=True)
+        row_bytes = 4 * self.dimensions
+        with open(self._data_path, "ab") as fh:
+            size = fh.seek(0, os.SEEK_END)
+            first_row = size // row_bytes
+            if size != first_row * row_bytes:
+                # A crash mid-append left a torn row; appending after it
+                # would shift every new row
+                fh.truncate(first_row * row_bytes)
+            fh.write(vectors.tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        for offset, key in enumerate(keys):
+            self._rows.pop(key, None)
+            self._rows[key] = first_row + offset
+        if new_store:
+            self._write_sidecar()
+        else:
+            self._append_log(keys)
+        self._remap()
+
+    def compact(self, keep: Iterable[str]) -> None:
+        """Drop every embedding not in keep when enough of the file is stale"""
+        if self._matrix is None:
+            return
+        keep = [key for key in dict.fromkeys(keep) if key in self._rows]
+        if len(keep) >= len(self._matrix) * (1 - COMPACT_STALE_RATIO):
+            return
+
+        # The old file (and its log) stays referenced until the new sidecar is durable
+        old_data_path = self._data_path
+        new_generation = self.generation + 1
+        with open(self._data_file(new_generation), "wb") as fh:
+            fh.write(np.ascontiguousarray(self.gather(keep)).tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        self.generation = new_generation
+        self._rows = {key: row for row, key in enumerate(keep)}
+        self._write_sidecar()
+        self._matrix = None
+        os.remove(old_data_path)
+        if os.path.exists(self._log_file(new_generation - 1)):
+            os.remove(self._log_file(new_generation - 1))
+        self._remap()
+        print(f"🧹 Compacted embedding store to {len(keep)} rows")
+
+    def _append_log(self, keys: List[str]) -> None:
+        """Record keys' current rows (O(len(keys))), folding the log into the sidecar when it is long"""
+        if self._log_lines + len(keys) > max(LOG_FOLD_MIN_LINES, len(self._rows)):
+            self._write_sidecar()
+            return
+        with open(self._log_path, "a", encoding="utf-8") as fh:
+            fh.write("".join(f"{key} {self._rows[key]}\n" for key in keys))
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._log_lines += len(keys)
+
+    def _write_sidecar(self) -> None:
+        """Write the full row map, then drop the log it supersedes"""
+        tmp_path = f"{self._index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fh:
+            json.dump({
+                "model": self.model,
+                "dimensions": self.dimensions,
+                "generation": self.generation,
+                "rows": self._rows
+            }, fh)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp_path, self._index_path)
+        # Replaying a log left behind by a crash here is harmless: its lines
+        # point into this same generation's data file
+        if os.path.exists(self._log_path):
+            os.remove(self._log_path)
+        self._log_lines = 0
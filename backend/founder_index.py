@@ -0,0 +1,465 @@
+"""
+Founder Index - vectorized similarity search over founder embeddings
+Backs /api/cofounders/match; large directories switch to an IVF ANN index
+
+AttributeIndex keeps skill / experience-level postings so filters and
+skill-overlap scores never rescan every founder's profile.
+"""
+
+import hashlib
+import json
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from ann_index import IVFIndex
+from embedding_store import text_hash
+
+# Directories at least this large are searched through the ANN index
+FOUNDER_ANN_MIN_SIZE = int(os.getenv("FOUNDER_ANN_MIN_SIZE", "20000"))
+FOUNDER_ANN_INDEX_PATH = os.getenv(
+    "FOUNDER_ANN_INDEX_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "founder_ann.npz")
+)
+# Filtered queries matching at most this many founders skip the ANN index
+# and score the matching rows exactly
+FOUNDER_FILTER_EXACT_MAX = int(os.getenv("FOUNDER_FILTER_EXACT_MAX", "5000"))
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Return a C-contiguous float32 copy of matrix with unit-length rows"""
+    matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0.0] = 1.0
+    return matrix / norms
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores, best first, without sorting everything
+
+    Ties go to the lower index, so results are deterministic.
+    """
+    if k <= 0 or scores.size == 0:
+        return np.empty(0, dtype=np.int64)
+    if k < scores.size:
+        kth = np.partition(scores, scores.size - k)[scores.size - k]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[:k - len(above)]
+        candidates = np.concatenate([above, tied])
+    else:
+        candidates = np.arange(scores.size)
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+def _attribute_key(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def profile_to_text(
+    skills: List[str],
+    goals: str,
+    personality: str,
+    experience: Optional[str],
+) -> str:
+    """Create a compact text representation of a founder profile for embeddings."""
+    parts = []
+    if skills:
+        parts.append("Skills: " + ", ".join(skills))
+    if goals:
+        parts.append("Goals: " + goals)
+    if personality:
+        parts.append("Personality: " + personality)
+    if experience:
+        parts.append("Experience level: " + experience)
+    return ". ".join(parts) if parts else ""
+
+
+def founder_profile_text(founder: Dict[str, Any]) -> str:
+    """Embedding text for a directory founder."""
+    return profile_to_text(
+        founder.get("skills", []),
+        founder.get("goals", ""),
+        founder.get("personality", ""),
+        founder.get("experienceLevel"),
+    ) or founder.get("name", "")
+
+
+def founder_keys(founders: Sequence[Dict[str, Any]], model: str) -> Tuple[List[str], List[str]]:
+    """(profile texts, embedding store keys) for founders, in order"""
+    texts = [founder_profile_text(founder) for founder in founders]
+    return texts, [text_hash(text, model) for text in texts]
+
+
+def directory_fingerprint(keys: Sequence[str]) -> str:
+    """Identity of a directory's embeddings in row order; saved ANN indexes are tagged with it"""
+    return hashlib.sha256("".join(keys).encode("utf-8")).hexdigest()
+
+
+def founder_digest(founder: Dict[str, Any]) -> str:
+    """Content hash of a founder profile, used to diff directory versions"""
+    return hashlib.sha256(json.dumps(founder, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def plan_directory_diff(
+    current: Sequence[Dict[str, Any]],
+    incoming: Sequence[Dict[str, Any]]
+) -> Tuple[List[int], List[Dict[str, Any]]]:
+    """
+    Compare the indexed founders with a newly loaded directory
+
+    Profiles are matched by content, so an edited profile shows up as one
+    removal plus one addition and unchanged profiles are left alone.
+
+    Returns:
+        (rows to remove in descending order, founders to add)
+    """
+    unmatched: Dict[str, List[int]] = defaultdict(list)
+    for row, founder in enumerate(current):
+        unmatched[founder_digest(founder)].append(row)
+
+    added = []
+    for founder in incoming:
+        rows = unmatched.get(founder_digest(founder))
+        if rows:
+            rows.pop()
+        else:
+            added.append(founder)
+
+    removed = sorted((row for rows in unmatched.values() for row in rows), reverse=True)
+    return removed, added
+
+
+class AttributeIndex:
+    """
+    Inverted index from lower-cased skill and experience level to founder rows.
+
+    Rows are positions in the directory list, so they line up with
+    FounderIndex rows and ANN ids. Postings are sets (O(1) add/remove) with
+    a sorted ndarray copy built on first use after a change, so queries can
+    test just a few candidate rows by binary search instead of building
+    per-founder arrays.
+    """
+
+    def __init__(self, founders: Iterable[Dict[str, Any]] = ()):
+        self._tables: Dict[str, Dict[str, Set[int]]] = {"skill": {}, "level": {}}
+        self._sorted: Dict[Tuple[str, str], np.ndarray] = {}
+        self._size = 0
+        for founder in founders:
+            self.add(founder)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, founder: Dict[str, Any]) -> int:
+        """Index the next founder row; returns its row"""
+        row = self._size
+        self._insert(row, founder)
+        self._size += 1
+        return row
+
+    def remove(self, row: int, founder: Dict[str, Any], last_founder: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Drop founder's postings at row; when row is not the last row,
+        last_founder (the last row) moves into it, matching FounderIndex.remove
+        """
+        self._discard(row, founder)
+        last = self._size - 1
+        if row != last and last_founder is not None:
+            self._discard(last, last_founder)
+            self._insert(row, last_founder)
+        self._size -= 1
+
+    def _attributes(self, founder: Dict[str, Any]) -> List[Tuple[str, str]]:
+        attributes = [("skill", skill) for skill in {_attribute_key(skill) for skill in founder.get("skills", [])}]
+        level = founder.get("experienceLevel")
+        if level:
+            attributes.append(("level", _attribute_key(level)))
+        return attributes
+
+    def _insert(self, row: int, founder: Dict[str, Any]) -> None:
+        for kind, key in self._attributes(founder):
+            self._tables[kind].setdefault(key, set()).add(row)
+            self._sorted.pop((kind, key), None)
+
+    def _discard(self, row: int, founder: Dict[str, Any]) -> None:
+        for kind, key in self._attributes(founder):
+            rows = self._tables[kind].get(key)
+            if rows is not None:
+                rows.discard(row)
+                if not rows:
+                    del self._tables[kind][key]
+            self._sorted.pop((kind, key), None)
+
+    def _rows(self, kind: str, key: str) -> np.ndarray:
+        """Sorted rows having one attribute"""
+        cached = self._sorted.get((kind, key))
+        if cached is None:
+            rows = self._tables[kind].get(key)
+            if not rows:
+                return np.empty(0, dtype=np.int64)
+            cached = np.sort(np.fromiter(rows, dtype=np.int64, count=len(rows)))
+            self._sorted[(kind, key)] = cached
+        return cached
+
+    @staticmethod
+    def _contains(sorted_rows: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        """Membership of each id in sorted_rows, by binary search"""
+        if not len(sorted_rows):
+            return np.zeros(len(ids), dtype=bool)
+        positions = np.minimum(np.searchsorted(sorted_rows, ids), len(sorted_rows) - 1)
+        return sorted_rows[positions] == ids
+
+    @staticmethod
+    def _filter_keys(
+        required_skills: Optional[Iterable[str]],
+        experience_levels: Optional[Iterable[str]]
+    ) -> Tuple[Set[str], Set[str]]:
+        return (
+            {_attribute_key(skill) for skill in required_skills or ()},
+            {_attribute_key(level) for level in experience_levels or ()}
+        )
+
+    def skill_overlap(self, skills: Iterable[str], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Number of the given skills each founder has, for rows (default: every row)"""
+        distinct = {_attribute_key(skill) for skill in skills}
+        if rows is None:
+            counts = np.zeros(self._size, dtype=np.float32)
+            for skill in distinct:
+                counts[self._rows("skill", skill)] += 1
+            return counts
+
+        rows = np.asarray(rows, dtype=np.int64)
+        counts = np.zeros(len(rows), dtype=np.float32)
+        for skill in distinct:
+            counts += self._contains(self._rows("skill", skill), rows)
+        return counts
+
+    def matches(
+        self,
+        rows: np.ndarray,
+        required_skills: Optional[Iterable[str]] = None,
+        experience_levels: Optional[Iterable[str]] = None
+    ) -> np.ndarray:
+        """Boolean mask over rows: has every required skill and one of the levels"""
+        required, levels = self._filter_keys(required_skills, experience_levels)
+        rows = np.asarray(rows, dtype=np.int64)
+        keep = np.ones(len(rows), dtype=bool)
+        for skill in required:
+            keep &= self._contains(self._rows("skill", skill), rows)
+        if levels:
+            at_level = np.zeros(len(rows), dtype=bool)
+            for level in levels:
+                at_level |= self._contains(self._rows("level", level), rows)
+            keep &= at_level
+        return keep
+
+    def match_bound(
+        self,
+        required_skills: Optional[Iterable[str]] = None,
+        experience_levels: Optional[Iterable[str]] = None
+    ) -> int:
+        """Upper bound on the founders passing the filters, from posting sizes alone"""
+        required, levels = self._filter_keys(required_skills, experience_levels)
+        bound = self._size
+        for skill in required:
+            bound = min(bound, len(self._tables["skill"].get(skill, ())))
+        if levels:
+            bound = min(bound, sum(len(self._tables["level"].get(level, ())) for level in levels))
+        return bound
+
+    def matching_rows(
+        self,
+        required_skills: Optional[Iterable[str]] = None,
+        experience_levels: Optional[Iterable[str]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Sorted rows with every required skill and one of the experience
+        levels, or None when there is nothing to filter on. Starts from the
+        shortest posting, so the cost follows the postings, not the directory.
+        """
+        required, levels = self._filter_keys(required_skills, experience_levels)
+        if not required and not levels:
+            return None
+
+        if required:
+            postings = sorted((self._rows("skill", skill) for skill in required), key=len)
+            rows = postings[0]
+            for posting in postings[1:]:
+                rows = rows[self._contains(posting, rows)]
+            return rows[self.matches(rows, experience_levels=levels)] if levels else rows
+
+        return np.unique(np.concatenate([self._rows("level", level) for level in levels]))
+
+    def rank_by_overlap(
+        self,
+        skills: Iterable[str],
+        k: int,
+        rows: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, int]]:
+        """Top k (row, shared skill count) pairs among rows (default: every row)"""
+        overlap = self.skill_overlap(skills, rows)
+        ids = np.arange(self._size) if rows is None else rows
+        return [(int(ids[i]), int(overlap[i])) for i in top_k(overlap, k)]
+
+
+class FounderIndex:
+    """
+    Founder profiles plus their embeddings as one pre-normalized float32
+    matrix, so scoring a query is a single matrix-vector product.
+
+    With an attached IVF index (see use_ann) queries only scan the closest
+    inverted lists instead of the whole matrix.
+    """
+
+    def __init__(
+        self,
+        founders: List[Dict[str, Any]],
+        embeddings: Sequence[Sequence[float]],
+        attributes: Optional[AttributeIndex] = None
+    ):
+        if len(founders) != len(embeddings):
+            raise ValueError("Each founder needs exactly one embedding")
+        self.founders = list(founders)
+        # Rows beyond len(founders) are spare capacity for add()
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        self._buffer = normalize_rows(matrix.reshape(len(founders), matrix.shape[-1]))
+        self.ann: Optional[IVFIndex] = None
+        self.attributes = attributes if attributes is not None else AttributeIndex(self.founders)
+        if len(self.attributes) != len(self.founders):
+            raise ValueError("Attribute index does not match the founder list")
+
+    def __len__(self) -> int:
+        return len(self.founders)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._buffer[:len(self.founders)]
+
+    def add(self, founder: Dict[str, Any], embedding: Sequence[float]) -> int:
+        """Append one founder (and insert it into the ANN index); returns its row"""
+        row = len(self.founders)
+        if row == len(self._buffer):
+            grown = np.empty((max(16, 2 * len(self._buffer)), self._buffer.shape[1]), dtype=np.float32)
+            grown[:row] = self._buffer
+            self._buffer = grown
+
+        self._buffer[row] = normalize_rows(np.asarray(embedding, dtype=np.float32)[np.newaxis, :])[0]
+        self.founders.append(founder)
+        self.attributes.add(founder)
+        if self.ann is not None:
+            self.ann.add([row], self._buffer[row])
+        return row
+
+    def remove(self, row: int) -> None:
+        """Drop one founder; the last row moves into its place (swap-delete)"""
+        last = len(self.founders) - 1
+        if self.ann is not None:
+            self.ann.remove(row, self._buffer[row])
+            if row != last:
+                self.ann.relabel(last, row, self._buffer[last])
+        self.attributes.remove(row, self.founders[row], self.founders[last] if row != last else None)
+        if row != last:
+            self._buffer[row] = self._buffer[last]
+            self.founders[row] = self.founders[last]
+        self.founders.pop()
+
+    def use_ann(
+        self,
+        fingerprint: str,
+        path: Optional[str] = FOUNDER_ANN_INDEX_PATH,
+        min_size: int = FOUNDER_ANN_MIN_SIZE
+    ) -> None:
+        """
+        Attach an IVF index when the directory has at least min_size founders
+
+        A saved index at path is reused if its fingerprint matches the current
+        directory; otherwise one is trained now and saved for the next start.
+        """
+        if len(self) < min_size:
+            self.ann = None
+            return
+
+        if path and os.path.exists(path):
+            try:
+                ann, saved_fingerprint = IVFIndex.load(path)
+                if saved_fingerprint == fingerprint and len(ann) == len(self):
+                    print(f"📇 Loaded founder ANN index ({len(ann)} vectors, {ann.n_lists} lists)")
+                    self.ann = ann
+                    return
+            except Exception as e:
+                print(f"⚠️  Founder ANN index unreadable, rebuilding: {e}")
+
+        self.ann = IVFIndex.build(self.matrix)
+        print(f"📇 Built founder ANN index ({len(self.ann)} vectors, {self.ann.n_lists} lists)")
+        if path:
+            try:
+                self.ann.save(path, fingerprint=fingerprint)
+            except OSError as e:
+                print(f"⚠️  Could not save founder ANN index: {e}")
+
+    def search(
+        self,
+        query: Sequence[float],
+        k: int,
+        nprobe: Optional[int] = None,
+        skills: Optional[Sequence[str]] = None,
+        skill_weight: float = 0.0,
+        required_skills: Optional[Sequence[str]] = None,
+        experience_levels: Optional[Sequence[str]] = None
+    ) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Return up to k (founder, score) pairs, best first
+
+        The score is cosine similarity plus skill_weight times the share of
+        `skills` the founder has. required_skills (all of them) and
+        experience_levels (any of them) are hard filters.
+
+        Args:
+            nprobe: ANN lists to scan (recall/latency knob); ignored for
+                exact search on small directories
+        """
+        if not self.founders:
+            return []
+
+        query = np.asarray(query, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0 or query.shape[0] != self._buffer.shape[1]:
+            return []
+        query = query / norm
+
+        # Skill bonus and filters are evaluated for candidate rows only, so an
+        # ANN query does no per-founder work
+        bonus = None
+        if skills and skill_weight:
+            distinct = {_attribute_key(skill) for skill in skills}
+            weight = skill_weight / len(distinct)
+            bonus = lambda rows: self.attributes.skill_overlap(distinct, rows) * weight
+        filtered = bool(required_skills or experience_levels)
+
+        if self.ann is not None and (
+            not filtered
+            or self.attributes.match_bound(required_skills, experience_levels) > FOUNDER_FILTER_EXACT_MAX
+        ):
+            allowed = None
+            if filtered:
+                allowed = lambda rows: self.attributes.matches(rows, required_skills, experience_levels)
+            rows, scores = self.ann.search(query, k, nprobe=nprobe, allowed=allowed, bonus=bonus)
+            # Broad filters usually leave enough in the probed lists; if not, fall through to exact
+            if len(rows) >= k or not filtered:
+                return [(self.founders[row], float(score)) for row, score in zip(rows, scores)]
+
+        rows = self.attributes.matching_rows(required_skills, experience_levels)
+        if rows is None:
+            scores = self.matrix @ query
+            if bonus is not None:
+                scores += bonus(np.arange(len(scores)))
+            return [(self.founders[i], float(scores[i])) for i in top_k(scores, k)]
+
+        # Score only the founders that pass the filters
+        scores = self.matrix[rows] @ query
+        if bonus is not None:
+            scores += bonus(rows)
+        return [(self.founders[rows[i]], float(scores[i])) for i in top_k(scores, k)]
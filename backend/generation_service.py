@@ -4,15 +4,28 @@ Flow: User idea → GPT-4o enriches → Sonnet generates FastAPI + SQLite → De
 """
 
 import os
+import re
 import json
+import asyncio
 import uuid
+import shutil
+import hashlib
 import zipfile
+import unicodedata
 from pathlib import Path
-from typing import Dict, Callable
+from typing import Dict, Callable, List, Optional, Tuple, Awaitable
 from openai import AsyncOpenAI
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
+import numpy as np
 from dotenv import load_dotenv
 
+from database import (
+    get_cached_enrichment, store_cached_enrichment, alias_cached_enrichment, list_enrichment_embeddings
+)
+from embedding_service import embed_text, VectorIndex
+from job_scheduler import job_scheduler
+from provider_limits import get_limiter
+
 # Load environment variables
 load_dotenv()
 
@@ -20,23 +33,119 @@ load_dotenv()
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
+# Enrichment cache: repeat ideas skip the GPT-4o call entirely
+ENRICHMENT_CACHE_TTL_SECONDS = float(os.getenv("ENRICHMENT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+ENRICHMENT_CACHE_MAX_ENTRIES = int(os.getenv("ENRICHMENT_CACHE_MAX_ENTRIES", "1000"))
+
+# Semantic enrichment cache: reworded ideas reuse a spec above this cosine similarity
+ENRICHMENT_SEMANTIC_CACHE = os.getenv("ENRICHMENT_SEMANTIC_CACHE", "true").lower() == "true"
+ENRICHMENT_SEMANTIC_THRESHOLD = float(os.getenv("ENRICHMENT_SEMANTIC_THRESHOLD", "0.92"))
+
+# Generated-code cache: identical specs reuse a previous Sonnet file set
+SONNET_MODEL = "claude-sonnet-4-5-20250929"
+CODE_CACHE_DIR = Path(os.getenv("CODE_CACHE_DIR", Path(__file__).parent / "cache" / "code"))
+CODE_CACHE_MAX_ENTRIES = int(os.getenv("CODE_CACHE_MAX_ENTRIES", "200"))
+
 def get_openai_client():
     """Lazy initialization of OpenAI client"""
     return AsyncOpenAI(api_key=OPENAI_API_KEY if OPENAI_API_KEY else None)
 
 def get_anthropic_client():
     """Lazy initialization of Anthropic client"""
-    return Anthropic(api_key=ANTHROPIC_API_KEY if ANTHROPIC_API_KEY else None)
+    return AsyncAnthropic(api_key=ANTHROPIC_API_KEY if ANTHROPIC_API_KEY else None)
+
+
+def normalize_idea(user_idea: str) -> str:
+    """Canonical form of an idea for cache keys: NFKC, lower-case, single spaces, no edge punctuation"""
+    text = unicodedata.normalize("NFKC", user_idea).lower()
+    text = re.sub(r"\s+", " ", text)
+    return text.strip(" \t\n\"'.,!?;:")
+
+
+def enrichment_cache_key(user_idea: str) -> str:
+    """Content address of an idea for the enrichment cache"""
+    return hashlib.sha256(normalize_idea(user_idea).encode("utf-8")).hexdigest()
 
 
 class PromptEnricher:
     """GPT-4o for enriching user prompts with examples, context, and specifications"""
 
+    # Enrichment cache counters (per process)
+    cache_hits = 0
+    semantic_hits = 0
+    cache_misses = 0
+
+    # Idea embeddings of cached specs, loaded from SQLite on first use
+    _semantic_index: Optional[VectorIndex] = None
+    _semantic_index_lock = asyncio.Lock()
+
+    @staticmethod
+    def cache_stats() -> Dict:
+        """Hit/miss counters for the enrichment cache"""
+        hits = PromptEnricher.cache_hits + PromptEnricher.semantic_hits
+        lookups = hits + PromptEnricher.cache_misses
+        return {
+            "hits": PromptEnricher.cache_hits,
+            "semantic_hits": PromptEnricher.semantic_hits,
+            "misses": PromptEnricher.cache_misses,
+            "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+            "ttl_seconds": ENRICHMENT_CACHE_TTL_SECONDS,
+            "max_entries": ENRICHMENT_CACHE_MAX_ENTRIES,
+            "semantic_threshold": ENRICHMENT_SEMANTIC_THRESHOLD if ENRICHMENT_SEMANTIC_CACHE else None,
+            "semantic_index_size": len(PromptEnricher._semantic_index or ())
+        }
+
+    @staticmethod
+    async def _get_semantic_index() -> VectorIndex:
+        """Load the idea-embedding index from the enrichment cache once per process"""
+        if PromptEnricher._semantic_index is None:
+            async with PromptEnricher._semantic_index_lock:
+                if PromptEnricher._semantic_index is None:
+                    index = VectorIndex()
+                    for key, blob in await list_enrichment_embeddings(ENRICHMENT_CACHE_TTL_SECONDS):
+                        index.add(key, np.frombuffer(blob, dtype=np.float32))
+                    PromptEnricher._semantic_index = index
+        return PromptEnricher._semantic_index
+
+    @staticmethod
+    async def _semantic_lookup(embedding: np.ndarray) -> Optional[Tuple[str, Dict]]:
+        """Return (cache key, spec) of the closest past idea above the similarity threshold"""
+        index = await PromptEnricher._get_semantic_index()
+        match = index.nearest(embedding)
+        if not match or match[1] < ENRICHMENT_SEMANTIC_THRESHOLD:
+            return None
+
+        key, similarity = match
+        cached = await get_cached_enrichment(key, ENRICHMENT_CACHE_TTL_SECONDS)
+        if cached is None:
+            # Expired or evicted since the index was loaded
+            index.remove(key)
+            return None
+
+        print(f"♻️  GPT-4o semantic cache hit (similarity {similarity:.3f})")
+        return key, cached
+
     @staticmethod
-    async def enrich_prompt(user_idea: str) -> Dict:
+    async def enrich_prompt(
+        user_idea: str,
+        use_cache: bool = True,
+        approval: Optional[Awaitable[bool]] = None
+    ) -> Dict:
         """
         Use GPT-4o to research and enrich the user's startup idea
 
+        Results are cached in SQLite keyed on the normalized idea text, so a
+        resubmitted idea returns the stored spec without calling GPT-4o. On an
+        exact miss the idea is embedded and a reworded idea whose embedding is
+        within ENRICHMENT_SEMANTIC_THRESHOLD of a cached one reuses its spec.
+
+        Args:
+            user_idea: Raw idea text
+            use_cache: Read from and write to the enrichment cache
+            approval: For speculative runs started before the security check;
+                awaited before anything is written to the cache, and a falsy
+                result discards the write
+
         Returns:
             {
                 "enriched_prompt": "Detailed prompt for code generation",
@@ -47,6 +156,38 @@ class PromptEnricher:
             }
         """
 
+        cache_key = enrichment_cache_key(user_idea)
+        embedding: Optional[np.ndarray] = None
+
+        if use_cache:
+            try:
+                cached = await get_cached_enrichment(cache_key, ENRICHMENT_CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"⚠️  Enrichment cache lookup failed: {e}")
+                cached = None
+
+            if cached:
+                PromptEnricher.cache_hits += 1
+                print(f"♻️  GPT-4o enrichment cache hit for: {user_idea[:60]}")
+                return cached
+
+            if ENRICHMENT_SEMANTIC_CACHE:
+                try:
+                    embedding = await embed_text(normalize_idea(user_idea))
+                    match = await PromptEnricher._semantic_lookup(embedding)
+                except Exception as e:
+                    print(f"⚠️  Semantic enrichment cache lookup failed: {e}")
+                    match = None
+
+                if match:
+                    PromptEnricher.semantic_hits += 1
+                    source_key, cached = match
+                    # Alias the wording so an exact repeat skips the embedding call
+                    await PromptEnricher._store_cached(cache_key, cached, embedding, approval, alias_of=source_key)
+                    return cached
+
+            PromptEnricher.cache_misses += 1
+
         print("="*80)
         print("🔵 GPT-4O PROMPT ENRICHMENT STARTING")
         print(f"📥 USER IDEA: {user_idea}")
@@ -95,15 +236,16 @@ Return as JSON."""
 
         print("🔄 Calling OpenAI GPT-4o...")
 
-        response = await client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7
-        )
+        async with get_limiter("openai"):
+            response = await client.chat.completions.create(
+                model="gpt-4o",
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                response_format={"type": "json_object"},
+                temperature=0.7
+            )
 
         result = json.loads(response.choices[0].message.content)
 
@@ -114,35 +256,290 @@ Return as JSON."""
         print(f"   Enriched Prompt Length: {len(result.get('enriched_prompt', ''))} chars")
         print("="*80)
 
+        if use_cache:
+            await PromptEnricher._store_cached(cache_key, result, embedding, approval)
+
         return result
 
+    @staticmethod
+    async def _store_cached(
+        cache_key: str,
+        spec: Dict,
+        embedding: Optional[np.ndarray],
+        approval: Optional[Awaitable[bool]] = None,
+        alias_of: Optional[str] = None
+    ) -> None:
+        """
+        Write a spec to the enrichment cache and, if embedded, the semantic index
+
+        alias_of names the cached entry the spec came from; the alias keeps
+        that entry's age so a semantic hit never extends a spec's TTL.
+        """
+        # Never cache a spec for a prompt the security check went on to reject
+        if approval is not None and not await approval:
+            return
+
+        blob = np.asarray(embedding, dtype=np.float32).tobytes() if embedding is not None else None
+        try:
+            if alias_of is not None:
+                await alias_cached_enrichment(cache_key, alias_of, ENRICHMENT_CACHE_MAX_ENTRIES, embedding=blob)
+            else:
+                await store_cached_enrichment(cache_key, spec, ENRICHMENT_CACHE_MAX_ENTRIES, embedding=blob)
+        except Exception as e:
+            print(f"⚠️  Enrichment cache store failed: {e}")
+            return
+
+        if embedding is not None and PromptEnricher._semantic_index is not None:
+            PromptEnricher._semantic_index.add(cache_key, embedding)
+
+
+class StreamingFileParser:
+    """
+    Incremental parser for Sonnet's FILE: / code-fence output format.
+
+    Consumes the response in arbitrary chunks and emits each file as soon as
+    its code fence closes. Files are either collected in memory (files) or,
+    when output_dir is given, written straight to disk as lines arrive so no
+    second copy of the response is kept. File contents match
+    '\\n'.join(lines).strip() of the lines inside the file's code fences.
+    """
+
+    def __init__(self, output_dir: Optional[Path] = None):
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.files: Dict[str, str] = {}
+        self.sizes: Dict[str, int] = {}
+
+        self._partial_line = ""
+        self._current_file: Optional[str] = None
+        self._in_code_block = False
+        self._reported = set()
+        self._closed = False
+
+        # Per-file sink state
+        self._handle = None
+        self._parts: List[str] = []
+        self._has_lines = False
+        self._started = False
+        self._pending = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, int]]:
+        """Consume a chunk, returning (filename, chars) for files whose fence just closed"""
+        completed: List[Tuple[str, int]] = []
+        lines = (self._partial_line + chunk).split('\n')
+        self._partial_line = lines.pop()
+
+        for line in lines:
+            self._consume_line(line, completed)
+
+        return completed
+
+    def close(self) -> List[Tuple[str, int]]:
+        """Flush the trailing partial line and finish the last file"""
+        completed: List[Tuple[str, int]] = []
+        if self._closed:
+            return completed
+        self._closed = True
+
+        # The text after the last newline is a line too (str.split semantics)
+        self._consume_line(self._partial_line, completed)
+        self._partial_line = ""
+
+        self._finish_file(completed)
+        return completed
+
+    def _consume_line(self, line: str, completed: List[Tuple[str, int]]) -> None:
+        if line.startswith('FILE:'):
+            self._finish_file(completed)
+            self._current_file = line.replace('FILE:', '').strip()
+            self._in_code_block = False
+            return
+
+        if not self._current_file:
+            return
+
+        if line.strip().startswith('```'):
+            self._in_code_block = not self._in_code_block
+            if not self._in_code_block and self._has_lines:
+                if self._handle:
+                    self._handle.flush()
+                self._report(completed)
+            return
+
+        if self._in_code_block:
+            self._add_line(line)
+
+    def _add_line(self, line: str) -> None:
+        """Append one content line, dropping leading/trailing whitespace like str.strip()"""
+        if not self._has_lines:
+            self._has_lines = True
+            self._open_sink()
+
+        if not self._started:
+            line = line.lstrip()
+            if not line:
+                return
+            self._started = True
+        else:
+            self._pending += '\n'
+
+        body = line.rstrip()
+        if body:
+            self._write(self._pending + body)
+            self._pending = line[len(body):]
+        else:
+            self._pending += line
+
+    def _open_sink(self) -> None:
+        self._parts = []
+        self._started = False
+        self._pending = ""
+        self.sizes[self._current_file] = 0
+
+        if self.output_dir:
+            file_path = (self.output_dir / self._current_file).resolve()
+            if self.output_dir.resolve() not in file_path.parents:
+                raise ValueError(f"Refusing to write outside project folder: {self._current_file}")
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            self._handle = open(file_path, "w", encoding="utf-8")
+
+    def _write(self, text: str) -> None:
+        self.sizes[self._current_file] += len(text)
+        if self._handle:
+            self._handle.write(text)
+        else:
+            self._parts.append(text)
+
+    def _report(self, completed: List[Tuple[str, int]]) -> None:
+        """Emit the current file once (its first fence close, or when it ends unclosed)"""
+        if self._current_file not in self._reported:
+            self._reported.add(self._current_file)
+            completed.append((self._current_file, self.sizes.get(self._current_file, 0)))
+
+    def _finish_file(self, completed: Optional[List[Tuple[str, int]]] = None) -> None:
+        if self._current_file and self._has_lines:
+            if completed is not None:
+                self._report(completed)
+            if self._handle:
+                self._handle.close()
+            else:
+                self.files[self._current_file] = "".join(self._parts)
+
+        self._handle = None
+        self._parts = []
+        self._has_lines = False
+        self._started = False
+        self._pending = ""
+
 
 class CodeGenerator:
     """Sonnet 4.5 for generating complete FastAPI + SQLite codebases"""
 
     @staticmethod
-    def generate_code(enriched_spec: Dict) -> Dict[str, str]:
+    async def generate_code_to_dir(
+        enriched_spec: Dict,
+        output_dir: Path,
+        on_file_complete: Optional[Callable[[str, int], Awaitable[None]]] = None
+    ) -> Dict[str, int]:
         """
-        Use Sonnet 4.5 to generate a complete FastAPI + SQLite backend
+        Use Sonnet 4.5 to generate a complete FastAPI + SQLite backend, writing
+        each file into output_dir while the response is still streaming
 
-        Args:
-            enriched_spec: Output from PromptEnricher
+        on_file_complete(filename, chars) is awaited as soon as each FILE:
+        block's code fence closes, before the rest of the response has arrived.
+
+        A spec that was generated before is served from the code cache by
+        copying the cached files into output_dir.
 
         Returns:
-            Dict of filename -> file contents
-            {
-                "main.py": "...",
-                "requirements.txt": "...",
-                "README.md": "..."
-            }
+            Dict of filename -> size in chars
         """
+        cache_key = CodeCache.key_for(enriched_spec)
+        cached = await asyncio.to_thread(CodeCache.copy_into, cache_key, Path(output_dir))
+        if cached is not None:
+            for filename, chars in cached.items():
+                if on_file_complete:
+                    await on_file_complete(filename, chars)
+            return cached
+
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        parser = StreamingFileParser(output_dir=output_dir)
+        await CodeGenerator._stream_files(enriched_spec, parser, on_file_complete)
+        await asyncio.to_thread(CodeCache.store_dir, cache_key, Path(output_dir), parser.sizes)
+        return parser.sizes
+
+    @staticmethod
+    async def _stream_files(
+        enriched_spec: Dict,
+        parser: StreamingFileParser,
+        on_file_complete: Optional[Callable[[str, int], Awaitable[None]]]
+    ) -> None:
+        """Stream the Sonnet response into parser, reporting files as they complete"""
 
         print("="*80)
         print("🟣 SONNET 4.5 CODE GENERATION STARTING")
         print(f"📥 Project: {enriched_spec.get('project_name', 'N/A')}")
         print("="*80)
 
-        prompt = f"""You are an expert Python backend developer. Generate a complete, production-ready FastAPI + SQLite backend.
+        prompt = CodeGenerator._build_prompt(enriched_spec)
+        client = get_anthropic_client()
+
+        print("🔄 Calling Anthropic Sonnet 4.5...")
+        print(f"   Model: {SONNET_MODEL}")
+
+        async def report(completed: List[Tuple[str, int]]):
+            for filename, chars in completed:
+                print(f"   📄 {filename} complete ({chars} chars)")
+                if on_file_complete:
+                    await on_file_complete(filename, chars)
+
+        # Raw event stream: text deltas go straight into the parser, the SDK
+        # doesn't accumulate its own copy of the response
+        input_tokens = 0
+        output_tokens = 0
+        response_chars = 0
+
+        # The Anthropic slot is held until the stream is fully consumed
+        try:
+            async with get_limiter("anthropic"):
+                stream = await client.messages.create(
+                    model=SONNET_MODEL,
+                    max_tokens=8000,
+                    temperature=0.3,
+                    messages=[
+                        {"role": "user", "content": prompt}
+                    ],
+                    stream=True
+                )
+                async for event in stream:
+                    if event.type == "content_block_delta" and event.delta.type == "text_delta":
+                        response_chars += len(event.delta.text)
+                        await report(parser.feed(event.delta.text))
+                    elif event.type == "message_start":
+                        input_tokens = event.message.usage.input_tokens
+                    elif event.type == "message_delta":
+                        output_tokens = event.usage.output_tokens
+        except BaseException:
+            # Release any open file handle before propagating
+            parser.close()
+            raise
+
+        await report(parser.close())
+
+        print("✅ SONNET 4.5 GENERATION COMPLETE")
+        print(f"   Response Length: {response_chars} chars")
+        print(f"   Input Tokens: {input_tokens}")
+        print(f"   Output Tokens: {output_tokens}")
+        print("="*80)
+
+        print(f"📁 Extracted {len(parser.sizes)} files:")
+        for filename, chars in parser.sizes.items():
+            print(f"   - {filename} ({chars} chars)")
+        print("="*80)
+
+    @staticmethod
+    def _build_prompt(enriched_spec: Dict) -> str:
+        """Sonnet prompt for an enriched spec"""
+        return f"""You are an expert Python backend developer. Generate a complete, production-ready FastAPI + SQLite backend.
 
 ## Project Specification:
 {enriched_spec['enriched_prompt']}
@@ -204,127 +601,172 @@ FILE: README.md
 
 Generate complete, working, immediately deployable code. No placeholders. No TODOs. Production-ready."""
 
-        client = get_anthropic_client()
-
-        print("🔄 Calling Anthropic Sonnet 4.5...")
-        print(f"   Model: claude-sonnet-4-5-20250929")
-
-        message = client.messages.create(
-            model="claude-sonnet-4-5-20250929",
-            max_tokens=8000,
-            temperature=0.3,
-            messages=[
-                {"role": "user", "content": prompt}
-            ]
-        )
-
-        response_text = message.content[0].text
+class CodeCache:
+    """
+    Persistent cache of Sonnet file sets keyed on the rendered prompt and model
 
-        print("✅ SONNET 4.5 GENERATION COMPLETE")
-        print(f"   Response Length: {len(response_text)} chars")
-        print(f"   Input Tokens: {message.usage.input_tokens}")
-        print(f"   Output Tokens: {message.usage.output_tokens}")
-        print("="*80)
+    Each entry is CODE_CACHE_DIR/<digest>/ holding files/ (the generated tree)
+    and manifest.json (filename -> chars). The manifest mtime doubles as the
+    last-used time for LRU eviction beyond CODE_CACHE_MAX_ENTRIES.
 
-        # Parse the response to extract files
-        files = CodeGenerator._parse_files_from_response(response_text)
+    Everything here is blocking file I/O; async callers run it through
+    asyncio.to_thread.
+    """
 
-        print(f"📁 Extracted {len(files)} files:")
-        for filename in files.keys():
-            print(f"   - {filename} ({len(files[filename])} chars)")
-        print("="*80)
+    # Code cache counters (per process)
+    hits = 0
+    misses = 0
 
-        return files
+    @staticmethod
+    def stats() -> Dict:
+        """Hit/miss counters for the code cache"""
+        lookups = CodeCache.hits + CodeCache.misses
+        return {
+            "hits": CodeCache.hits,
+            "misses": CodeCache.misses,
+            "hit_rate": round(CodeCache.hits / lookups, 3) if lookups else 0.0,
+            "max_entries": CODE_CACHE_MAX_ENTRIES
+        }
 
     @staticmethod
-    def _parse_files_from_response(response: str) -> Dict[str, str]:
+    def key_for(enriched_spec: Dict) -> str:
         """
-        Parse Sonnet's response to extract file contents
-
-        Expected format:
-        FILE: main.py
-        ```python
-        code here
-        ```
-
-        FILE: requirements.txt
-        ```
-        content here
-        ```
+        Digest of the exact Sonnet prompt and model
+
+        Hashing the rendered prompt covers every spec field it interpolates
+        (project_name and description included), so specs that differ only
+        in those fields never share generated files.
         """
-        files = {}
-        lines = response.split('\n')
+        prompt = CodeGenerator._build_prompt(enriched_spec)
+        digest = hashlib.sha256(SONNET_MODEL.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(prompt.encode("utf-8"))
+        return digest.hexdigest()
 
-        current_file = None
-        current_content = []
-        in_code_block = False
+    @staticmethod
+    def _contained(base_dir: Path, filename: str) -> Path:
+        """Resolve filename under base_dir, refusing paths that escape it"""
+        path = (base_dir / filename).resolve()
+        if base_dir.resolve() not in path.parents:
+            raise ValueError(f"Refusing to use a path outside the cache entry: {filename}")
+        return path
 
-        for line in lines:
-            # Check for file markers
-            if line.startswith('FILE:'):
-                # Save previous file
-                if current_file and current_content:
-                    files[current_file] = '\n'.join(current_content).strip()
+    @staticmethod
+    def _load_manifest(cache_key: str) -> Optional[Dict[str, int]]:
+        """Read an entry's manifest and mark it recently used; None on a miss"""
+        manifest_path = CODE_CACHE_DIR / cache_key / "manifest.json"
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            os.utime(manifest_path)
+        except (OSError, ValueError):
+            CodeCache.misses += 1
+            return None
+
+        CodeCache.hits += 1
+        print(f"♻️  Code cache hit: {cache_key[:12]} ({len(manifest)} files)")
+        return manifest
 
-                # Start new file
-                current_file = line.replace('FILE:', '').strip()
-                current_content = []
-                in_code_block = False
+    @staticmethod
+    def copy_into(cache_key: str, output_dir: Path) -> Optional[Dict[str, int]]:
+        """
+        Copy a cached file set into output_dir
 
-            elif current_file:
-                # Check for code block markers
-                if line.strip().startswith('```'):
-                    in_code_block = not in_code_block
-                    continue
+        Copies (not hardlinks) so later edits to the project can't alter the
+        cache entry. Returns the manifest (filename -> chars), or None on a
+        miss. A partial restore is removed so the caller can regenerate into
+        a clean folder.
+        """
+        manifest = CodeCache._load_manifest(cache_key)
+        if manifest is None:
+            return None
+
+        files_dir = CODE_CACHE_DIR / cache_key / "files"
+        try:
+            for filename in manifest:
+                target = CodeCache._contained(output_dir, filename)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(CodeCache._contained(files_dir, filename), target)
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Code cache restore failed: {e}")
+            shutil.rmtree(output_dir, ignore_errors=True)
+            return None
+
+        return manifest
 
-                # Add content if inside code block
-                if in_code_block:
-                    current_content.append(line)
+    @staticmethod
+    def store_dir(cache_key: str, source_dir: Path, sizes: Dict[str, int]) -> None:
+        """Cache a file set already written to source_dir"""
+        def populate(files_dir: Path):
+            for filename in sizes:
+                target = CodeCache._contained(files_dir, filename)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                # Copy rather than link so later edits to the project can't alter the cache
+                shutil.copy2(source_dir / filename, target)
 
-        # Save last file
-        if current_file and current_content:
-            files[current_file] = '\n'.join(current_content).strip()
+        CodeCache._store(cache_key, sizes, populate)
 
-        return files
+    @staticmethod
+    def _store(cache_key: str, sizes: Dict[str, int], populate: Callable[[Path], None]) -> None:
+        """Build an entry in a temp folder, publish it with an atomic rename, then evict"""
+        if not sizes:
+            return
+
+        staging = CODE_CACHE_DIR / f".tmp-{uuid.uuid4().hex}"
+        try:
+            (staging / "files").mkdir(parents=True)
+            populate(staging / "files")
+            (staging / "manifest.json").write_text(json.dumps(sizes), encoding="utf-8")
+            staging.rename(CODE_CACHE_DIR / cache_key)
+        except (OSError, ValueError) as e:
+            # Most likely another job cached the same spec first
+            print(f"⚠️  Code cache store skipped: {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        CodeCache._evict()
+
+    @staticmethod
+    def _evict() -> None:
+        """Remove least recently used entries beyond CODE_CACHE_MAX_ENTRIES"""
+        entries = []
+        for entry in CODE_CACHE_DIR.iterdir():
+            manifest_path = entry / "manifest.json"
+            if entry.name.startswith(".") or not manifest_path.exists():
+                continue
+            try:
+                entries.append((manifest_path.stat().st_mtime, entry))
+            except OSError:
+                continue
+
+        entries.sort(reverse=True)
+        for _, entry in entries[CODE_CACHE_MAX_ENTRIES:]:
+            shutil.rmtree(entry, ignore_errors=True)
 
 
 class ProjectManager:
     """Manages local project folders and zip files"""
 
     @staticmethod
-    def save_project(project_id: str, files: Dict[str, str]) -> tuple[Path, Path]:
+    def project_dir(project_id: str) -> Path:
+        """Local folder for a project's generated files"""
+        return Path("projects") / project_id
+
+    @staticmethod
+    def package_project(project_id: str) -> Path:
         """
-        Save generated files to local folder and create zip
+        Zip an already-populated project folder for deployment
 
         Args:
             project_id: Unique project identifier
-            files: Dict of filename -> content
 
         Returns:
-            (project_path, zip_path)
+            zip_path
         """
 
-        print("="*80)
-        print("💾 SAVING PROJECT TO DISK")
-        print(f"   Project ID: {project_id}")
-        print("="*80)
-
-        # Create directories if they don't exist
-        projects_dir = Path("projects")
-        projects_dir.mkdir(exist_ok=True)
-
         tmp_dir = Path("tmp")
         tmp_dir.mkdir(exist_ok=True)
 
-        # Create project folder
-        project_path = projects_dir / project_id
-        project_path.mkdir(parents=True, exist_ok=True)
-
-        # Write all files
-        for filename, content in files.items():
-            file_path = project_path / filename
-            file_path.write_text(content, encoding="utf-8")
-            print(f"   ✅ Wrote {filename} ({len(content)} chars)")
+        project_path = ProjectManager.project_dir(project_id)
 
         # Create zip file
         zip_path = tmp_dir / f"{project_id}.zip"
@@ -336,14 +778,15 @@ class ProjectManager:
         print(f"   📦 Created zip: {zip_path} ({zip_path.stat().st_size / 1024:.1f} KB)")
         print("="*80)
 
-        return project_path, zip_path
+        return zip_path
 
 
 # Main orchestration function
 async def generate_startup_backend(
     user_idea: str,
     job_id: str,
-    log_callback: Callable
+    log_callback: Callable,
+    enrichment: Optional[Awaitable[Dict]] = None
 ) -> Dict:
     """
     Complete pipeline: Enrich → Generate → Save → Deploy
@@ -351,7 +794,9 @@ async def generate_startup_backend(
     Args:
         user_idea: User's raw startup idea
         job_id: Job ID for tracking
-        log_callback: Function(job_id, message, type) for progress updates
+        log_callback: Async function(job_id, message, type) for progress updates
+        enrichment: Already-started enrichment (e.g. a speculative task) to
+            await instead of calling PromptEnricher
 
     Returns:
         {
@@ -359,7 +804,7 @@ async def generate_startup_backend(
             "project_name": str,
             "project_path": str,
             "zip_path": str,
-            "files": Dict[str, str],
+            "files": Dict[str, int],  # filename -> size in chars
             "spec": Dict
         }
     """
@@ -371,35 +816,45 @@ async def generate_startup_backend(
     print("="*80 + "\n")
 
     # Step 1: Enrich prompt with GPT-4o (0-25%)
-    log_callback(job_id, "🔍 Researching your idea and finding competitors...", "info")
+    await log_callback(job_id, "🔍 Researching your idea and finding competitors...", "info")
 
     try:
-        enriched_spec = await PromptEnricher.enrich_prompt(user_idea)
-        log_callback(job_id, f"✅ Found {len(enriched_spec.get('example_companies', []))} competitors and identified key features", "success")
+        if enrichment is not None:
+            enriched_spec = await enrichment
+        else:
+            async with job_scheduler.stage("enrich"):
+                enriched_spec = await PromptEnricher.enrich_prompt(user_idea)
+        await log_callback(job_id, f"✅ Found {len(enriched_spec.get('example_companies', []))} competitors and identified key features", "success")
     except Exception as e:
-        log_callback(job_id, f"❌ Enrichment failed: {str(e)}", "error")
+        await log_callback(job_id, f"❌ Enrichment failed: {str(e)}", "error")
         raise
 
     # Step 2: Generate code with Sonnet 4.5 (25-50%)
-    log_callback(job_id, "⚙️ Generating complete FastAPI backend with SQLite...", "info")
+    # Files are written into the project folder while Sonnet is still streaming
+    await log_callback(job_id, "⚙️ Generating complete FastAPI backend with SQLite...", "info")
+
+    project_id = str(uuid.uuid4())
+    project_path = ProjectManager.project_dir(project_id)
+
+    async def report_file(filename: str, chars: int):
+        await log_callback(job_id, f"📄 Generated {filename} ({chars} chars)", "info")
 
     try:
-        files = CodeGenerator.generate_code(enriched_spec)
-        log_callback(job_id, f"✅ Generated {len(files)} files with production-ready code", "success")
+        async with job_scheduler.stage("codegen"):
+            files = await CodeGenerator.generate_code_to_dir(enriched_spec, project_path, on_file_complete=report_file)
+        await log_callback(job_id, f"✅ Generated {len(files)} files with production-ready code", "success")
     except Exception as e:
-        log_callback(job_id, f"❌ Code generation failed: {str(e)}", "error")
+        await log_callback(job_id, f"❌ Code generation failed: {str(e)}", "error")
         raise
 
-    # Step 3: Save to disk and create zip (50-60%)
-    log_callback(job_id, "💾 Saving project files and creating deployment package...", "info")
-
-    project_id = str(uuid.uuid4())
+    # Step 3: Create zip (50-60%)
+    await log_callback(job_id, "💾 Saving project files and creating deployment package...", "info")
 
     try:
-        project_path, zip_path = ProjectManager.save_project(project_id, files)
-        log_callback(job_id, "✅ Project saved and zipped successfully", "success")
+        zip_path = await asyncio.to_thread(ProjectManager.package_project, project_id)
+        await log_callback(job_id, "✅ Project saved and zipped successfully", "success")
     except Exception as e:
-        log_callback(job_id, f"❌ File save failed: {str(e)}", "error")
+        await log_callback(job_id, f"❌ File save failed: {str(e)}", "error")
         raise
 
     print("\n" + "="*80)
@@ -0,0 +1,63 @@
+"""
+Job Events - in-process pub/sub for generation job progress
+Feeds the /api/status/{job_id}/stream Server-Sent Events endpoint
+"""
+
+import asyncio
+import json
+from typing import Any, Dict, Set
+
+TERMINAL_STATUSES = {"completed", "failed"}
+
+# Events buffered per subscriber before it is asked to resync from the store
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+class JobEventBroker:
+    """Fans job events (log, step, progress, status) out to live subscribers"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        """Register a new subscriber queue for a job"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        """Remove a subscriber queue, dropping the job entry when empty"""
+        queues = self._subscribers.get(job_id)
+        if not queues:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[job_id]
+
+    def publish(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        """
+        Push an event to every subscriber of a job.
+
+        A subscriber that has fallen behind gets its backlog replaced by a
+        single "resync" event so it can reload the job snapshot instead.
+        """
+        for queue in self._subscribers.get(job_id, ()):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(("resync", {}))
+
+    def subscriber_count(self, job_id: str) -> int:
+        """Number of live subscribers for a job"""
+        return len(self._subscribers.get(job_id, ()))
+
+
+def format_sse(event: str, data: Dict[str, Any]) -> str:
+    """Encode one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+# Process-wide broker shared by main.py
+job_events = JobEventBroker()
@@ -0,0 +1,183 @@
+"""
+Job Scheduler - bounded queue and worker pool for generation pipelines
+Admission control for /api/generate plus per-stage concurrency limits
+"""
+
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Pipelines running at once (per process)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+# Jobs allowed to wait for a worker before /api/generate answers 429
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "20"))
+# Starting estimate of one pipeline's duration, refined as jobs finish
+JOB_ETA_DEFAULT_SECONDS = float(os.getenv("JOB_ETA_DEFAULT_SECONDS", "180"))
+
+# Concurrent jobs allowed inside each pipeline stage
+STAGE_WORKERS = {
+    "enrich": int(os.getenv("STAGE_WORKERS_ENRICH", "4")),
+    "codegen": int(os.getenv("STAGE_WORKERS_CODEGEN", "2")),
+    "deploy": int(os.getenv("STAGE_WORKERS_DEPLOY", "2")),
+    "assets": int(os.getenv("STAGE_WORKERS_ASSETS", "2")),
+}
+
+# Weight of the newest job in the moving-average duration
+DURATION_SMOOTHING = 0.2
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class JobScheduler:
+    """
+    FIFO of pending jobs drained by a fixed pool of worker tasks.
+
+    Jobs are (job_id, runner, args); each stage of a running job additionally
+    takes a slot from that stage's semaphore via `async with scheduler.stage()`.
+    """
+
+    def __init__(
+        self,
+        workers: int = JOB_WORKERS,
+        max_queue: int = JOB_QUEUE_MAX,
+        stage_workers: Optional[Dict[str, int]] = None
+    ):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.stage_workers = dict(stage_workers or STAGE_WORKERS)
+        self._stages = {name: asyncio.Semaphore(limit) for name, limit in self.stage_workers.items()}
+        self._pending: "OrderedDict[str, tuple]" = OrderedDict()
+        self._running: Dict[str, float] = {}
+        self._wakeup = asyncio.Condition()
+        self._tasks: List[asyncio.Task] = []
+        self._avg_duration = JOB_ETA_DEFAULT_SECONDS
+
+    # --- lifecycle ---
+
+    def start(self) -> None:
+        """Spawn the worker tasks (call from the running event loop)"""
+        if self._tasks:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> List[str]:
+        """
+        Cancel the workers; running jobs are cancelled with them
+
+        Returns:
+            ids of jobs that were still waiting and will never run
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        abandoned = list(self._pending)
+        self._pending.clear()
+        return abandoned
+
+    # --- admission ---
+
+    def is_full(self) -> bool:
+        return len(self._pending) >= self.max_queue
+
+    async def submit(self, job_id: str, runner: Callable[..., Awaitable[Any]], *args) -> int:
+        """
+        Queue runner(*args) for job_id and return its 1-based queue position
+
+        Raises:
+            QueueFullError: max_queue jobs are already waiting
+        """
+        async with self._wakeup:
+            if self.is_full():
+                raise QueueFullError(f"Job queue is full ({self.max_queue} waiting)")
+            self._pending[job_id] = (runner, args)
+            position = len(self._pending)
+            self._wakeup.notify()
+        return position
+
+    # --- stages ---
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        """Hold one of the stage's worker slots for the duration of the block"""
+        semaphore = self._stages.get(name)
+        if semaphore is None:
+            yield
+            return
+        async with semaphore:
+            yield
+
+    async def acquire_stage(self, name: str) -> Callable[[], None]:
+        """
+        Take one of the stage's worker slots outside a block
+
+        Returns the function that gives the slot back, for work that can
+        outlive its caller (a thread keeps running after a timeout).
+        """
+        semaphore = self._stages.get(name)
+        if semaphore is None:
+            return lambda: None
+        await semaphore.acquire()
+        return semaphore.release
+
+    # --- reporting ---
+
+    def position(self, job_id: str) -> Optional[int]:
+        """1-based position among waiting jobs, or None once started"""
+        for index, pending_id in enumerate(self._pending):
+            if pending_id == job_id:
+                return index + 1
+        return None
+
+    def eta_seconds(self, job_id: str) -> Optional[float]:
+        """Rough seconds until job_id finishes, from the moving-average job duration"""
+        position = self.position(job_id)
+        if position is not None:
+            # Jobs ahead drain `workers` at a time, then this one runs in full
+            waves = (position - 1) // max(self.workers, 1) + 1
+            return round(waves * self._avg_duration + self._avg_duration, 1)
+
+        started_at = self._running.get(job_id)
+        if started_at is not None:
+            return round(max(self._avg_duration - (time.monotonic() - started_at), 0.0), 1)
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self._pending),
+            "running": len(self._running),
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "stage_workers": self.stage_workers,
+            "avg_job_seconds": round(self._avg_duration, 1)
+        }
+
+    # --- workers ---
+
+    async def _worker(self) -> None:
+        while True:
+            async with self._wakeup:
+                await self._wakeup.wait_for(lambda: bool(self._pending))
+                job_id, (runner, args) = self._pending.popitem(last=False)
+
+            started_at = time.monotonic()
+            self._running[job_id] = started_at
+            try:
+                await runner(*args)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"❌ Job {job_id} raised in scheduler: {e}")
+            finally:
+                self._running.pop(job_id, None)
+                duration = time.monotonic() - started_at
+                self._avg_duration += DURATION_SMOOTHING * (duration - self._avg_duration)
+
+
+# Process-wide scheduler shared by main.py and generation_service.py
+job_scheduler = JobScheduler()
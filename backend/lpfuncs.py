@@ -4,26 +4,109 @@ Handles text-to-image and image-to-video generation using Livepeer AI SDK
 """
 
 import os
-from typing import Optional, Dict, Any
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Callable
 from livepeer_ai import Livepeer
+import httpx
 import requests
 import tempfile
 import time
 import shutil
 
+from provider_limits import get_limiter
+
+# Max Livepeer calls in flight across the process for the *_async API
+LIVEPEER_MAX_WORKERS = int(os.getenv("LIVEPEER_MAX_WORKERS", "8"))
+
+# Connection pool for the shared Livepeer client
+LIVEPEER_MAX_CONNECTIONS = int(os.getenv("LIVEPEER_MAX_CONNECTIONS", "20"))
+LIVEPEER_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LIVEPEER_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LIVEPEER_KEEPALIVE_EXPIRY = float(os.getenv("LIVEPEER_KEEPALIVE_EXPIRY", "60"))
+# Per-request deadline for Livepeer API calls; a worker thread can't be
+# cancelled, so this is what bounds how long one call holds it
+LIVEPEER_HTTP_TIMEOUT_SECONDS = float(os.getenv("LIVEPEER_HTTP_TIMEOUT_SECONDS", "120"))
+
+_livepeer_executor: Optional[ThreadPoolExecutor] = None
+_livepeer_client: Optional[Livepeer] = None
+_livepeer_http_client: Optional[httpx.Client] = None
+_livepeer_client_lock = threading.Lock()
+_download_session: Optional[requests.Session] = None
+
 
 def get_livepeer_client() -> Livepeer:
     """
-    Get Livepeer client with API key from environment
+    Get the shared Livepeer client with API key from environment
+    
+    The client is created once per process on top of a pooled keep-alive
+    httpx.Client, so repeated image/refine/video calls reuse warm connections.
+    It is shared by all lpfuncs functions: don't close it or use it as a
+    context manager (call close_livepeer_client() on shutdown instead).
     
     Returns:
         Livepeer: Configured Livepeer client
     """
+    global _livepeer_client, _livepeer_http_client
+    if _livepeer_client is not None:
+        return _livepeer_client
+    
     api_key = os.getenv("LIVEPEER_API_KEY")
     if not api_key:
         raise ValueError("LIVEPEER_API_KEY not found in environment variables")
     
-    return Livepeer(http_bearer=api_key)
+    with _livepeer_client_lock:
+        if _livepeer_client is None:
+            _livepeer_http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=LIVEPEER_MAX_CONNECTIONS,
+                    max_keepalive_connections=LIVEPEER_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=LIVEPEER_KEEPALIVE_EXPIRY
+                )
+            )
+            _livepeer_client = Livepeer(
+                http_bearer=api_key,
+                client=_livepeer_http_client,
+                timeout_ms=int(LIVEPEER_HTTP_TIMEOUT_SECONDS * 1000)
+            )
+    
+    return _livepeer_client
+
+
+def get_download_session() -> requests.Session:
+    """
+    Get the shared requests session used to download generated images
+    
+    Returns:
+        requests.Session: Session with a keep-alive pool of LIVEPEER_MAX_CONNECTIONS
+    """
+    global _download_session
+    if _download_session is None:
+        with _livepeer_client_lock:
+            if _download_session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(
+                    pool_connections=LIVEPEER_MAX_KEEPALIVE_CONNECTIONS,
+                    pool_maxsize=LIVEPEER_MAX_CONNECTIONS
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _download_session = session
+    return _download_session
+
+
+def close_livepeer_client() -> None:
+    """Close the shared Livepeer and download connection pools (next call builds new ones)"""
+    global _livepeer_client, _livepeer_http_client, _download_session
+    with _livepeer_client_lock:
+        if _livepeer_http_client is not None:
+            _livepeer_http_client.close()
+        if _download_session is not None:
+            _download_session.close()
+        _livepeer_client = None
+        _livepeer_http_client = None
+        _download_session = None
 
 
 def generate_image_from_text(
@@ -55,8 +138,9 @@ def generate_image_from_text(
         >>> result = generate_image_from_text("A futuristic startup office")
         >>> image_url = result['images'][0]['url']
     """
-    with get_livepeer_client() as livepeer:
-        try:
+    livepeer = get_livepeer_client()
+    try:
+        with get_limiter("livepeer"):
             res = livepeer.generate.text_to_image(request={
                 "model_id": "black-forest-labs/FLUX.1-dev",
                 "loras": "",
@@ -69,40 +153,40 @@ def generate_image_from_text(
                 "num_inference_steps": num_inference_steps,
                 "num_images_per_prompt": 1,
             })
-            
-            if res.image_response is None:
-                raise Exception("No image response received from Livepeer")
-            
-            # Extract images from response (Livepeer returns Pydantic objects)
-            images = []
-            if hasattr(res.image_response, 'images') and res.image_response.images:
-                for img in res.image_response.images:
-                    # Access URL attribute directly, not via .get()
-                    images.append({
-                        "url": img.url if hasattr(img, 'url') else None,
-                        "seed": img.seed if hasattr(img, 'seed') else None,
-                        "nsfw": img.nsfw if hasattr(img, 'nsfw') else None
-                    })
-            
-            # Convert response to dict for easier handling
-            return {
-                "success": True,
-                "images": images,
-                "raw_response": res.image_response
-            }
-            
-        except Exception as e:
-            return {
-                "success": False,
-                "error": str(e),
-                "images": []
-            }
+        
+        if res.image_response is None:
+            raise Exception("No image response received from Livepeer")
+        
+        # Extract images from response (Livepeer returns Pydantic objects)
+        images = []
+        if hasattr(res.image_response, 'images') and res.image_response.images:
+            for img in res.image_response.images:
+                # Access URL attribute directly, not via .get()
+                images.append({
+                    "url": img.url if hasattr(img, 'url') else None,
+                    "seed": img.seed if hasattr(img, 'seed') else None,
+                    "nsfw": img.nsfw if hasattr(img, 'nsfw') else None
+                })
+        
+        # Convert response to dict for easier handling
+        return {
+            "success": True,
+            "images": images,
+            "raw_response": res.image_response
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "images": []
+        }
 
 
 def download_image_to_temp(image_url: str) -> str:
     """Download an image URL to a temporary file and return the local path."""
     try:
-        response = requests.get(image_url, timeout=30)
+        response = get_download_session().get(image_url, timeout=30)
         response.raise_for_status()
         temp_dir = tempfile.gettempdir()
         fname = f"lp_image_{os.urandom(8).hex()}.png"
@@ -140,10 +224,11 @@ def refine_image_text_readability(
     while attempt < max_retries:
         attempt += 1
         try:
-            with get_livepeer_client() as livepeer:
-                # Open file as binary as required by SDK
-                with open(image_path, 'rb') as f:
-                    print(f"🔧 [refine] Sending image_to_image request (attempt {attempt}) to model {model_id}...")
+            livepeer = get_livepeer_client()
+            # Open file as binary as required by SDK
+            with open(image_path, 'rb') as f:
+                print(f"🔧 [refine] Sending image_to_image request (attempt {attempt}) to model {model_id}...")
+                with get_limiter("livepeer"):
                     res = livepeer.generate.image_to_image(request={
                         "prompt": prompt,
                         "image": {
@@ -161,54 +246,54 @@ def refine_image_text_readability(
                         "num_images_per_prompt": 1,
                     })
 
-                # Check response
-                if getattr(res, 'image_response', None) is None:
-                    raise Exception("No image_response returned from image_to_image")
-
-                # Attempt to extract returned image URL
-                img_url = None
-                images = []
-                if hasattr(res.image_response, 'images') and res.image_response.images:
-                    for img in res.image_response.images:
-                        url = img.url if hasattr(img, 'url') else None
-                        images.append({
-                            "url": url,
-                            "seed": getattr(img, 'seed', None),
-                            "nsfw": getattr(img, 'nsfw', None)
-                        })
-                        if not img_url and url:
-                            img_url = url
-
-                # If we got a remote URL, download it to a temp file and return the path
-                if img_url:
-                    try:
-                        refined_path = download_image_to_temp(img_url)
-                        return {
-                            "success": True,
-                            "image_path": refined_path,
-                            "image_url": img_url,
-                            "images": images,
-                            "raw_response": res.image_response
-                        }
-                    except Exception as e:
-                        # If download failed, still return the URL
-                        return {
-                            "success": True,
-                            "image_path": None,
-                            "image_url": img_url,
-                            "images": images,
-                            "raw_response": res.image_response,
-                            "warning": f"Could not download refined image locally: {e}"
-                        }
-
-                # If no URL but images present, still return raw images structure
-                return {
-                    "success": True,
-                    "image_path": None,
-                    "image_url": None,
-                    "images": images,
-                    "raw_response": res.image_response
-                }
+            # Check response
+            if getattr(res, 'image_response', None) is None:
+                raise Exception("No image_response returned from image_to_image")
+
+            # Attempt to extract returned image URL
+            img_url = None
+            images = []
+            if hasattr(res.image_response, 'images') and res.image_response.images:
+                for img in res.image_response.images:
+                    url = img.url if hasattr(img, 'url') else None
+                    images.append({
+                        "url": url,
+                        "seed": getattr(img, 'seed', None),
+                        "nsfw": getattr(img, 'nsfw', None)
+                    })
+                    if not img_url and url:
+                        img_url = url
+
+            # If we got a remote URL, download it to a temp file and return the path
+            if img_url:
+                try:
+                    refined_path = download_image_to_temp(img_url)
+                    return {
+                        "success": True,
+                        "image_path": refined_path,
+                        "image_url": img_url,
+                        "images": images,
+                        "raw_response": res.image_response
+                    }
+                except Exception as e:
+                    # If download failed, still return the URL
+                    return {
+                        "success": True,
+                        "image_path": None,
+                        "image_url": img_url,
+                        "images": images,
+                        "raw_response": res.image_response,
+                        "warning": f"Could not download refined image locally: {e}"
+                    }
+
+            # If no URL but images present, still return raw images structure
+            return {
+                "success": True,
+                "image_path": None,
+                "image_url": None,
+                "images": images,
+                "raw_response": res.image_response
+            }
 
         except Exception as e:
             last_error = e
@@ -258,10 +343,11 @@ def generate_video_from_image(
         >>> result = generate_video_from_image("startup_logo.png")
         >>> video_url = result['video']['url']
     """
-    with get_livepeer_client() as livepeer:
-        try:
-            # Read the image file
-            with open(image_path, "rb") as image_file:
+    livepeer = get_livepeer_client()
+    try:
+        # Read the image file
+        with open(image_path, "rb") as image_file:
+            with get_limiter("livepeer"):
                 res = livepeer.generate.image_to_video(request={
                     "image": {
                         "file_name": os.path.basename(image_path),
@@ -276,39 +362,39 @@ def generate_video_from_image(
                     "safety_check": safety_check,
                     "num_inference_steps": num_inference_steps,
                 })
-                
-                if res.video_response is None:
-                    raise Exception("No video response received from Livepeer")
-                
-                # Extract video from response (Livepeer returns Pydantic objects)
-                video_data = None
-                if hasattr(res.video_response, 'video') and res.video_response.video:
-                    vid = res.video_response.video
-                    video_data = {
-                        "url": vid.url if hasattr(vid, 'url') else None,
-                        "seed": vid.seed if hasattr(vid, 'seed') else None,
-                        "nsfw": vid.nsfw if hasattr(vid, 'nsfw') else None
-                    }
-                
-                # Convert response to dict for easier handling
-                return {
-                    "success": True,
-                    "video": video_data,
-                    "raw_response": res.video_response
+            
+            if res.video_response is None:
+                raise Exception("No video response received from Livepeer")
+            
+            # Extract video from response (Livepeer returns Pydantic objects)
+            video_data = None
+            if hasattr(res.video_response, 'video') and res.video_response.video:
+                vid = res.video_response.video
+                video_data = {
+                    "url": vid.url if hasattr(vid, 'url') else None,
+                    "seed": vid.seed if hasattr(vid, 'seed') else None,
+                    "nsfw": vid.nsfw if hasattr(vid, 'nsfw') else None
                 }
-                
-        except FileNotFoundError:
-            return {
-                "success": False,
-                "error": f"Image file not found: {image_path}",
-                "video": None
-            }
-        except Exception as e:
+            
+            # Convert response to dict for easier handling
             return {
-                "success": False,
-                "error": str(e),
-                "video": None
+                "success": True,
+                "video": video_data,
+                "raw_response": res.video_response
             }
+            
+    except FileNotFoundError:
+        return {
+            "success": False,
+            "error": f"Image file not found: {image_path}",
+            "video": None
+        }
+    except Exception as e:
+        return {
+            "success": False,
+            "error": str(e),
+            "video": None
+        }
 
 
 def generate_video_from_image_url(
@@ -343,29 +429,27 @@ def generate_video_from_image_url(
         >>> result = generate_video_from_image_url("https://example.com/image.png")
         >>> video_url = result['video']['url']
     """
-    import requests
-    import tempfile
-    
-    with get_livepeer_client() as livepeer:
-        try:
-            print(f"📥 Downloading image from URL...")
-            # Download the image
-            response = requests.get(image_url, timeout=30)
-            response.raise_for_status()
-            
-            # Save to temporary file with proper extension
-            temp_dir = tempfile.gettempdir()
-            temp_filename = f"livepeer_image_{os.urandom(8).hex()}.png"
-            temp_path = os.path.join(temp_dir, temp_filename)
-            
-            with open(temp_path, 'wb') as f:
-                f.write(response.content)
-            
-            print(f"💾 Image saved temporarily to: {temp_path}")
-            print(f"🎬 Generating video from image...")
-            
-            # Open and send the file as Livepeer expects
-            with open(temp_path, "rb") as image_file:
+    livepeer = get_livepeer_client()
+    try:
+        print(f"📥 Downloading image from URL...")
+        # Download the image
+        response = get_download_session().get(image_url, timeout=30)
+        response.raise_for_status()
+        
+        # Save to temporary file with proper extension
+        temp_dir = tempfile.gettempdir()
+        temp_filename = f"livepeer_image_{os.urandom(8).hex()}.png"
+        temp_path = os.path.join(temp_dir, temp_filename)
+        
+        with open(temp_path, 'wb') as f:
+            f.write(response.content)
+        
+        print(f"💾 Image saved temporarily to: {temp_path}")
+        print(f"🎬 Generating video from image...")
+        
+        # Open and send the file as Livepeer expects
+        with open(temp_path, "rb") as image_file:
+            with get_limiter("livepeer"):
                 res = livepeer.generate.image_to_video(request={
                     "image": {
                         "file_name": temp_filename,
@@ -380,52 +464,52 @@ def generate_video_from_image_url(
                     "safety_check": safety_check,
                     "num_inference_steps": num_inference_steps,
                 })
-            
-            # Clean up temporary file
-            try:
-                os.unlink(temp_path)
-                print(f"🧹 Cleaned up temporary file")
-            except:
-                pass
-            
-            if res.video_response is None:
-                raise Exception("No video response received from Livepeer")
-            
-            # Extract video from response (Livepeer returns Pydantic objects)
-            video_data = None
-            if hasattr(res.video_response, 'video') and res.video_response.video:
-                vid = res.video_response.video
-                video_data = {
-                    "url": vid.url if hasattr(vid, 'url') else None,
-                    "seed": vid.seed if hasattr(vid, 'seed') else None,
-                    "nsfw": vid.nsfw if hasattr(vid, 'nsfw') else None
-                }
-            
-            return {
-                "success": True,
-                "video": video_data,
-                "raw_response": res.video_response
-            }
-            
-        except requests.RequestException as e:
-            return {
-                "success": False,
-                "error": f"Failed to download image: {str(e)}",
-                "video": None
-            }
-        except Exception as e:
-            # Clean up temp file if it exists
-            try:
-                if 'temp_path' in locals():
-                    os.unlink(temp_path)
-            except:
-                pass
-            
-            return {
-                "success": False,
-                "error": str(e),
-                "video": None
+        
+        # Clean up temporary file
+        try:
+            os.unlink(temp_path)
+            print(f"🧹 Cleaned up temporary file")
+        except:
+            pass
+        
+        if res.video_response is None:
+            raise Exception("No video response received from Livepeer")
+        
+        # Extract video from response (Livepeer returns Pydantic objects)
+        video_data = None
+        if hasattr(res.video_response, 'video') and res.video_response.video:
+            vid = res.video_response.video
+            video_data = {
+                "url": vid.url if hasattr(vid, 'url') else None,
+                "seed": vid.seed if hasattr(vid, 'seed') else None,
+                "nsfw": vid.nsfw if hasattr(vid, 'nsfw') else None
             }
+        
+        return {
+            "success": True,
+            "video": video_data,
+            "raw_response": res.video_response
+        }
+        
+    except requests.RequestException as e:
+        return {
+            "success": False,
+            "error": f"Failed to download image: {str(e)}",
+            "video": None
+        }
+    except Exception as e:
+        # Clean up temp file if it exists
+        try:
+            if 'temp_path' in locals():
+                os.unlink(temp_path)
+        except:
+            pass
+        
+        return {
+            "success": False,
+            "error": str(e),
+            "video": None
+        }
 
 
 # Convenience function for the complete workflow
@@ -722,6 +806,64 @@ def generate_startup_branding(
     }
 
 
+# === ASYNC API ===
+# The Livepeer SDK is blocking. These variants run each call on a dedicated,
+# bounded thread pool so async handlers never stall the event loop.
+
+def get_livepeer_executor() -> ThreadPoolExecutor:
+    """
+    Get the process-wide executor used by the *_async functions
+    
+    Returns:
+        ThreadPoolExecutor: Pool with LIVEPEER_MAX_WORKERS threads
+    """
+    global _livepeer_executor
+    if _livepeer_executor is None:
+        _livepeer_executor = ThreadPoolExecutor(
+            max_workers=LIVEPEER_MAX_WORKERS,
+            thread_name_prefix="livepeer"
+        )
+    return _livepeer_executor
+
+
+async def run_livepeer_call(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """
+    Run a blocking Livepeer function on the Livepeer executor and await it
+    
+    Example:
+        >>> result = await run_livepeer_call(generate_image_from_text, "A rocket")
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_livepeer_executor(),
+        functools.partial(func, *args, **kwargs)
+    )
+
+
+def _offloaded(func: Callable[..., Any]) -> Callable[..., Any]:
+    """Build the async variant of a blocking lpfuncs function"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run_livepeer_call(func, *args, **kwargs)
+
+    wrapper.__name__ = f"{func.__name__}_async"
+    wrapper.__qualname__ = wrapper.__name__
+    wrapper.__doc__ = (
+        f"Async variant of {func.__name__}(), run on the Livepeer executor.\n"
+        + (func.__doc__ or "")
+    )
+    return wrapper
+
+
+generate_image_from_text_async = _offloaded(generate_image_from_text)
+download_image_to_temp_async = _offloaded(download_image_to_temp)
+refine_image_text_readability_async = _offloaded(refine_image_text_readability)
+generate_video_from_image_async = _offloaded(generate_video_from_image)
+generate_video_from_image_url_async = _offloaded(generate_video_from_image_url)
+generate_marketing_assets_async = _offloaded(generate_marketing_assets)
+generate_startup_branding_async = _offloaded(generate_startup_branding)
+
+
 if __name__ == "__main__":
     # Example usage
     print("Testing Livepeer AI functions...")
@@ -4,14 +4,27 @@ Generates a professional 5-slide pitch deck for startups using Livepeer AI
 """
 
 import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 import time
 from dotenv import load_dotenv
-from lpfuncs import generate_image_from_text, download_image_to_temp, refine_image_text_readability
+from lpfuncs import (
+    generate_image_from_text, download_image_to_temp, refine_image_text_readability,
+    run_livepeer_call
+)
 
 # Load environment variables
 load_dotenv()
 
+# How many slides are generated at once (each slide = text_to_image + download + refine)
+PITCH_DECK_MAX_CONCURRENCY = int(os.getenv("PITCH_DECK_MAX_CONCURRENCY", "3"))
+
+REFINE_PROMPT = (
+    "Enhance and render all visible text in English; make text bold, high contrast, "
+    "large, and readable at presentation size. Preserve layout and icons."
+)
+
 
 def generate_pitch_deck(
     startup_idea: str,
@@ -19,7 +32,8 @@ def generate_pitch_deck(
     industry: str = "",
     target_market: str = "",
     business_model: str = "",
-    style: str = "professional minimalist"
+    style: str = "professional minimalist",
+    max_concurrency: int = PITCH_DECK_MAX_CONCURRENCY
 ) -> Dict[str, Any]:
     """
     Generate a complete 5-slide pitch deck for a startup idea.
@@ -38,11 +52,13 @@ def generate_pitch_deck(
         target_market: Description of target customers
         business_model: How the company generates revenue
         style: Visual style ("professional minimalist", "modern tech", "bold colorful")
+        max_concurrency: How many slides to generate in parallel
         
     Returns:
         Dict containing:
         - success: bool
-        - slides: List of dicts with slide_number, title, image_url
+        - slides: List of dicts with slide_number, title, image_url (in slide order)
+        - slide_timings: Per-slide latency in seconds
         - error: str (if failed)
         
     Example:
@@ -71,187 +87,147 @@ def generate_pitch_deck(
         words = startup_idea.split()[:3]
         startup_name = "".join([w.capitalize() for w in words])
     
-    # Base prompt styling
-    base_style = f"{style} pitch deck slide, clean layout, investor presentation, high contrast, readable text, professional design"
+    slide_specs = _build_slide_specs(startup_name)
+    workers = max(1, min(max_concurrency, len(slide_specs)))
     
-    # Define the 5 slides
-    slides = []
+    print(f"\n📊 Generating {len(slide_specs)} slides ({workers} at a time)...")
+    deck_start = time.perf_counter()
     
-    # SLIDE 1: TITLE SLIDE
-    print("\n📊 Generating Slide 1/5: Title Slide...")
-    slide_1_prompt = f"""
-Minimalist corporate presentation title slide in English,
-only large bold text: "{startup_name}" centered as main headline,
-simple geometric icon logo above the text,
-solid light background, ultra-clean layout, no small text, no subtitles,
-modern sans-serif typography, high contrast, professional aesthetic,
-graphic design poster style, vector art, no photos
-"""
+    # Fan the slides out; results come back in slide order
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pitch-slide") as executor:
+        results = list(executor.map(_generate_slide, slide_specs))
     
-    slide_1 = generate_image_from_text(
-        prompt=slide_1_prompt.strip(),
-        negative_prompt="small text, tiny font, descriptive text, paragraphs, unreadable text, blurry, non-English, foreign language, messy, photo, people, cluttered, complex details",
-        width=1024,
-        height=576,
-        guidance_scale=14.0,
-        num_inference_steps=60,
-        safety_check=True
-    )
+    return _assemble_deck(results, startup_name, time.perf_counter() - deck_start)
+
+
+async def generate_pitch_deck_async(
+    startup_idea: str,
+    startup_name: str = "",
+    industry: str = "",
+    target_market: str = "",
+    business_model: str = "",
+    style: str = "professional minimalist",
+    max_concurrency: int = PITCH_DECK_MAX_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Async variant of generate_pitch_deck().
     
-    if slide_1["success"] and slide_1["images"]:
-        image_url = slide_1["images"][0]["url"]
-        slide_entry = {
-            "slide_number": 1,
-            "title": "Title Slide",
-            "image_url": image_url,
-            "prompt": slide_1_prompt.strip()
-        }
+    Each slide runs on the shared Livepeer executor (see lpfuncs.run_livepeer_call),
+    at most max_concurrency slides at a time, so decks from concurrent jobs share
+    one bounded pool instead of each spawning their own threads.
+    """
+    
+    print("=" * 80)
+    print("🎯 GENERATING INVESTOR PITCH DECK")
+    print("=" * 80)
+    print(f"Startup: {startup_name or 'Auto-naming based on idea'}")
+    print(f"Style: {style}")
+    print("=" * 80)
+    
+    if not startup_name:
+        words = startup_idea.split()[:3]
+        startup_name = "".join([w.capitalize() for w in words])
+    
+    slide_specs = _build_slide_specs(startup_name)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    
+    async def run_slide(spec: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await run_livepeer_call(_generate_slide, spec)
+    
+    deck_start = time.perf_counter()
+    results = await asyncio.gather(*(run_slide(spec) for spec in slide_specs))
+    
+    return _assemble_deck(list(results), startup_name, time.perf_counter() - deck_start)
 
-        # Attempt to download and refine the slide to improve text readability
-        try:
-            local_path = download_image_to_temp(image_url)
-            refine_prompt = (
-                "Enhance and render all visible text in English; make text bold, high contrast, "
-                "large, and readable at presentation size. Preserve layout and icons."
-            )
-            refined = refine_image_text_readability(local_path, refine_prompt)
-            if refined.get("success"):
-                # Prefer local refined path if available, otherwise use returned URL
-                if refined.get("image_path"):
-                    slide_entry["refined_image_path"] = refined.get("image_path")
-                else:
-                    slide_entry["refined_image_url"] = refined.get("image_url")
-            else:
-                slide_entry["refine_error"] = refined.get("error")
-        except Exception as e:
-            slide_entry["refine_error"] = str(e)
 
-        slides.append(slide_entry)
-        print(f"✅ Slide 1 generated: {image_url}")
-        time.sleep(2)  # Small delay between requests
-    else:
+def _assemble_deck(results: List[Dict[str, Any]], startup_name: str, deck_seconds: float) -> Dict[str, Any]:
+    """Turn ordered per-slide results into the generate_pitch_deck() response"""
+    slide_timings = [
+        {
+            "slide_number": result["slide_number"],
+            "success": result["success"],
+            "seconds": result["seconds"]
+        }
+        for result in results
+    ]
+    
+    # The title slide is mandatory, the rest are best-effort
+    if not results[0]["success"]:
         return {
             "success": False,
-            "error": f"Failed to generate Slide 1: {slide_1.get('error', 'Unknown error')}",
-            "slides": []
+            "error": f"Failed to generate Slide 1: {results[0]['error']}",
+            "slides": [],
+            "slide_timings": slide_timings
         }
     
-    # SLIDE 2: PROBLEM SLIDE
-    print("\n📊 Generating Slide 2/5: Problem Slide...")
-    # Use actual problem or generic VC pitch deck problems
-    problem_context = f"addressing issues in {industry if industry else 'the market'}" if startup_idea else "solving key market inefficiencies"
+    slides = [result["slide"] for result in results if result["success"]]
+    
+    # Summary
+    print("\n" + "=" * 80)
+    print(f"✅ PITCH DECK GENERATION COMPLETE")
+    print(f"   Successfully generated {len(slides)}/{len(results)} slides in {deck_seconds:.1f}s")
+    for timing in slide_timings:
+        print(f"   Slide {timing['slide_number']}: {timing['seconds']:.1f}s {'✅' if timing['success'] else '⚠️'}")
+    print("=" * 80)
     
-    slide_2_prompt = f"""
+    return {
+        "success": len(slides) > 0,
+        "slides": slides,
+        "startup_name": startup_name,
+        "total_slides": len(slides),
+        "slide_timings": slide_timings,
+        "total_seconds": round(deck_seconds, 2),
+        "message": f"Generated {len(slides)}/{len(results)} pitch deck slides"
+    }
+
+
+def _build_slide_specs(startup_name: str) -> List[Dict[str, Any]]:
+    """Prompts for the 5 investor slides, in deck order"""
+    return [
+        {
+            "slide_number": 1,
+            "title": "Title Slide",
+            "prompt": f"""
+Minimalist corporate presentation title slide in English,
+only large bold text: "{startup_name}" centered as main headline,
+simple geometric icon logo above the text,
+solid light background, ultra-clean layout, no small text, no subtitles,
+modern sans-serif typography, high contrast, professional aesthetic,
+graphic design poster style, vector art, no photos
+""",
+            "negative_prompt": "small text, tiny font, descriptive text, paragraphs, unreadable text, blurry, non-English, foreign language, messy, photo, people, cluttered, complex details"
+        },
+        {
+            "slide_number": 2,
+            "title": "The Problem",
+            "prompt": """
 Simple business slide in English with large bold title "THE PROBLEM" at top,
 three large icons with single-word labels only: "INEFFICIENCY", "COST", "TIME",
 minimalist icon-based layout, no paragraphs, no small text, no descriptions,
 high contrast bold text on clean white background, professional minimalist style,
 only show title and 3 large icons with one-word labels, vector graphics,
 no detailed text, no complex explanations
-"""
-    
-    slide_2 = generate_image_from_text(
-        prompt=slide_2_prompt.strip(),
-        negative_prompt="small text, tiny font, paragraphs, detailed descriptions, unreadable text, blurry, non-English, messy, photo, people, cluttered, long sentences",
-        width=1024,
-        height=576,
-        guidance_scale=14.0,
-        num_inference_steps=60,
-        safety_check=True
-    )
-    
-    if slide_2["success"] and slide_2["images"]:
-        image_url = slide_2["images"][0]["url"]
-        slide_entry = {
-            "slide_number": 2,
-            "title": "The Problem",
-            "image_url": image_url,
-            "prompt": slide_2_prompt.strip()
-        }
-        try:
-            local_path = download_image_to_temp(image_url)
-            refine_prompt = (
-                "Enhance and render all visible text in English; make text bold, high contrast, "
-                "large, and readable at presentation size. Preserve layout and icons."
-            )
-            refined = refine_image_text_readability(local_path, refine_prompt)
-            if refined.get("success"):
-                if refined.get("image_path"):
-                    slide_entry["refined_image_path"] = refined.get("image_path")
-                else:
-                    slide_entry["refined_image_url"] = refined.get("image_url")
-            else:
-                slide_entry["refine_error"] = refined.get("error")
-        except Exception as e:
-            slide_entry["refine_error"] = str(e)
-
-        slides.append(slide_entry)
-        print(f"✅ Slide 2 generated: {image_url}")
-        time.sleep(2)  # Small delay between requests
-    else:
-        print(f"⚠️  Slide 2 failed, continuing...")
-        time.sleep(1)
-    
-    # SLIDE 3: SOLUTION SLIDE
-    print("\n📊 Generating Slide 3/5: Solution Slide...")
-    solution_features = f"{startup_name} platform" if startup_name else "our innovative platform"
-    
-    slide_3_prompt = f"""
+""",
+            "negative_prompt": "small text, tiny font, paragraphs, detailed descriptions, unreadable text, blurry, non-English, messy, photo, people, cluttered, long sentences"
+        },
+        {
+            "slide_number": 3,
+            "title": "Our Solution",
+            "prompt": """
 Minimalist business slide in English with large title "OUR SOLUTION",
 simple diagram showing 3 boxes connected by arrows,
 each box contains only single-word labels: "PLATFORM", "AUTOMATION", "INSIGHTS",
 clean geometric shapes, no detailed text, no small descriptions,
 high contrast bold text on light background, professional tech style,
 only large readable words, vector graphics, ultra-simple layout
-"""
-    
-    slide_3 = generate_image_from_text(
-        prompt=slide_3_prompt.strip(),
-        negative_prompt="small text, tiny font, paragraphs, detailed descriptions, long sentences, unreadable, blurry, non-English, photo, people, complex diagrams, cluttered",
-        width=1024,
-        height=576,
-        guidance_scale=14.0,
-        num_inference_steps=60,
-        safety_check=True
-    )
-    
-    if slide_3["success"] and slide_3["images"]:
-        image_url = slide_3["images"][0]["url"]
-        slide_entry = {
-            "slide_number": 3,
-            "title": "Our Solution",
-            "image_url": image_url,
-            "prompt": slide_3_prompt.strip()
-        }
-        try:
-            local_path = download_image_to_temp(image_url)
-            refine_prompt = (
-                "Enhance and render all visible text in English; make text bold, high contrast, "
-                "large, and readable at presentation size. Preserve layout and icons."
-            )
-            refined = refine_image_text_readability(local_path, refine_prompt)
-            if refined.get("success"):
-                if refined.get("image_path"):
-                    slide_entry["refined_image_path"] = refined.get("image_path")
-                else:
-                    slide_entry["refined_image_url"] = refined.get("image_url")
-            else:
-                slide_entry["refine_error"] = refined.get("error")
-        except Exception as e:
-            slide_entry["refine_error"] = str(e)
-
-        slides.append(slide_entry)
-        print(f"✅ Slide 3 generated: {image_url}")
-        time.sleep(2)  # Small delay between requests
-    else:
-        print(f"⚠️  Slide 3 failed, continuing...")
-        time.sleep(1)
-    
-    # SLIDE 4: MARKET OPPORTUNITY
-    print("\n📊 Generating Slide 4/5: Market Opportunity...")
-    market_info = target_market if target_market else "B2B SaaS market"
-    
-    slide_4_prompt = f"""
+""",
+            "negative_prompt": "small text, tiny font, paragraphs, detailed descriptions, long sentences, unreadable, blurry, non-English, photo, people, complex diagrams, cluttered"
+        },
+        {
+            "slide_number": 4,
+            "title": "Market Opportunity",
+            "prompt": """
 Clean business slide in English with large title "MARKET OPPORTUNITY",
 show only 3 large numbers: "$10B", "$2B", "$500M" displayed prominently,
 simple labels above numbers: "TAM", "SAM", "SOM",
@@ -259,55 +235,13 @@ one large upward arrow with "45%" text,
 no paragraphs, no small text, no detailed descriptions,
 minimalist infographic with only big bold numbers and single-word labels,
 high contrast, clean white background, vector graphics style
-"""
-    
-    slide_4 = generate_image_from_text(
-        prompt=slide_4_prompt.strip(),
-        negative_prompt="small text, tiny font, detailed descriptions, paragraphs, long sentences, unreadable numbers, blurry, non-English, photo, people, cluttered, complex charts",
-        width=1024,
-        height=576,
-        guidance_scale=14.0,
-        num_inference_steps=60,
-        safety_check=True
-    )
-    
-    if slide_4["success"] and slide_4["images"]:
-        image_url = slide_4["images"][0]["url"]
-        slide_entry = {
-            "slide_number": 4,
-            "title": "Market Opportunity",
-            "image_url": image_url,
-            "prompt": slide_4_prompt.strip()
-        }
-        try:
-            local_path = download_image_to_temp(image_url)
-            refine_prompt = (
-                "Enhance and render all visible text in English; make text bold, high contrast, "
-                "large, and readable at presentation size. Preserve layout and icons."
-            )
-            refined = refine_image_text_readability(local_path, refine_prompt)
-            if refined.get("success"):
-                if refined.get("image_path"):
-                    slide_entry["refined_image_path"] = refined.get("image_path")
-                else:
-                    slide_entry["refined_image_url"] = refined.get("image_url")
-            else:
-                slide_entry["refine_error"] = refined.get("error")
-        except Exception as e:
-            slide_entry["refine_error"] = str(e)
-
-        slides.append(slide_entry)
-        print(f"✅ Slide 4 generated: {image_url}")
-        time.sleep(2)  # Small delay between requests
-    else:
-        print(f"⚠️  Slide 4 failed, continuing...")
-        time.sleep(1)
-    
-    # SLIDE 5: BUSINESS MODEL
-    print("\n📊 Generating Slide 5/5: Business Model...")
-    biz_model = business_model if business_model else "SaaS subscription model"
-    
-    slide_5_prompt = f"""
+""",
+            "negative_prompt": "small text, tiny font, detailed descriptions, paragraphs, long sentences, unreadable numbers, blurry, non-English, photo, people, cluttered, complex charts"
+        },
+        {
+            "slide_number": 5,
+            "title": "Business Model",
+            "prompt": """
 Simple business slide in English with large title "BUSINESS MODEL",
 show 3 pricing boxes side by side with only large text:
 "FREE", "$29", "CUSTOM",
@@ -315,11 +249,29 @@ simple dollar sign icon, clean boxes layout, no detailed features list,
 no small text, no descriptions, no bullet points,
 minimalist pricing tier visualization, high contrast bold text,
 white background, professional vector graphics, ultra-clean design
-"""
+""",
+            "negative_prompt": "small text, tiny font, detailed descriptions, feature lists, paragraphs, long text, unreadable, blurry, non-English, photo, people, cluttered, complex diagrams"
+        },
+    ]
+
+
+def _generate_slide(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate one slide: text_to_image, download, then image_to_image refine.
+    
+    Returns:
+        Dict with slide_number, success, seconds, and either slide (entry for
+        the deck) or error
+    """
+    slide_number = spec["slide_number"]
+    prompt = spec["prompt"].strip()
+    started = time.perf_counter()
     
-    slide_5 = generate_image_from_text(
-        prompt=slide_5_prompt.strip(),
-        negative_prompt="small text, tiny font, detailed descriptions, feature lists, paragraphs, long text, unreadable, blurry, non-English, photo, people, cluttered, complex diagrams",
+    print(f"📊 Generating Slide {slide_number}/5: {spec['title']}...")
+    
+    generated = generate_image_from_text(
+        prompt=prompt,
+        negative_prompt=spec["negative_prompt"],
         width=1024,
         height=576,
         guidance_scale=14.0,
@@ -327,48 +279,47 @@ white background, professional vector graphics, ultra-clean design
         safety_check=True
     )
     
-    if slide_5["success"] and slide_5["images"]:
-        image_url = slide_5["images"][0]["url"]
-        slide_entry = {
-            "slide_number": 5,
-            "title": "Business Model",
-            "image_url": image_url,
-            "prompt": slide_5_prompt.strip()
+    if not (generated["success"] and generated["images"]):
+        print(f"⚠️  Slide {slide_number} failed")
+        return {
+            "slide_number": slide_number,
+            "success": False,
+            "error": generated.get("error", "Unknown error"),
+            "seconds": round(time.perf_counter() - started, 2)
         }
-        try:
-            local_path = download_image_to_temp(image_url)
-            refine_prompt = (
-                "Enhance and render all visible text in English; make text bold, high contrast, "
-                "large, and readable at presentation size. Preserve layout and icons."
-            )
-            refined = refine_image_text_readability(local_path, refine_prompt)
-            if refined.get("success"):
-                if refined.get("image_path"):
-                    slide_entry["refined_image_path"] = refined.get("image_path")
-                else:
-                    slide_entry["refined_image_url"] = refined.get("image_url")
+    
+    image_url = generated["images"][0]["url"]
+    slide_entry = {
+        "slide_number": slide_number,
+        "title": spec["title"],
+        "image_url": image_url,
+        "prompt": prompt
+    }
+    
+    # Attempt to download and refine the slide to improve text readability
+    try:
+        local_path = download_image_to_temp(image_url)
+        refined = refine_image_text_readability(local_path, REFINE_PROMPT)
+        if refined.get("success"):
+            # Prefer local refined path if available, otherwise use returned URL
+            if refined.get("image_path"):
+                slide_entry["refined_image_path"] = refined.get("image_path")
             else:
-                slide_entry["refine_error"] = refined.get("error")
-        except Exception as e:
-            slide_entry["refine_error"] = str(e)
-
-        slides.append(slide_entry)
-        print(f"✅ Slide 5 generated: {image_url}")
-    else:
-        print(f"⚠️  Slide 5 failed, continuing...")
+                slide_entry["refined_image_url"] = refined.get("image_url")
+        else:
+            slide_entry["refine_error"] = refined.get("error")
+    except Exception as e:
+        slide_entry["refine_error"] = str(e)
     
-    # Summary
-    print("\n" + "=" * 80)
-    print(f"✅ PITCH DECK GENERATION COMPLETE")
-    print(f"   Successfully generated {len(slides)}/5 slides")
-    print("=" * 80)
+    seconds = round(time.perf_counter() - started, 2)
+    slide_entry["generation_seconds"] = seconds
+    print(f"✅ Slide {slide_number} generated in {seconds:.1f}s: {image_url}")
     
     return {
-        "success": len(slides) > 0,
-        "slides": slides,
-        "startup_name": startup_name,
-        "total_slides": len(slides),
-        "message": f"Generated {len(slides)}/5 pitch deck slides"
+        "slide_number": slide_number,
+        "success": True,
+        "slide": slide_entry,
+        "seconds": seconds
     }
 
 
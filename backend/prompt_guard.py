@@ -0,0 +1,167 @@
+"""
+Prompt Guard - local fast-path classifier in front of the GPT-4o-mini security check
+Settles clear-cut prompts in microseconds; only ambiguous ones reach the LLM
+"""
+
+import os
+import re
+import unicodedata
+from collections import Counter
+from typing import List, Tuple
+
+SAFE = "safe"
+UNSAFE = "unsafe"
+AMBIGUOUS = "ambiguous"
+
+# Prompts longer than this are rejected outright
+SANITIZE_MAX_PROMPT_CHARS = int(os.getenv("SANITIZE_MAX_PROMPT_CHARS", "4000"))
+# Prompts longer than this are never approved locally
+SANITIZE_FAST_PATH_MAX_CHARS = int(os.getenv("SANITIZE_FAST_PATH_MAX_CHARS", "600"))
+
+MAX_BRACKET_DEPTH = 6
+MIN_TOKENS_FOR_REPETITION_CHECK = 20
+MAX_REPEATED_TOKEN_SHARE = 0.35
+
+
+def _compile(patterns: List[str]) -> List[re.Pattern]:
+    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+
+# Instruction-override phrases and chat-template tokens: the only patterns a
+# local UNSAFE verdict (which is final) is reserved for
+BLOCK_PATTERNS = {
+    "prompt_injection": _compile([
+        r"\b(ignore|disregard)\s+(all\s+)?(the\s+|your\s+)?(previous|prior|above)\s+(instructions|prompts)\b",
+        r"\bdo anything now\b",
+        r"<\|im_(start|end)\|>|\[/?inst\]|###\s*(system|instruction)",
+    ]),
+}
+
+# Attack-shaped text that also turns up in real product ideas (a schema
+# migration tool mentions ALTER TABLE, an email builder {{merge tags}}):
+# escalated to the LLM check with the category as a hint, never blocked here
+ESCALATE_PATTERNS = {
+    "prompt_injection": _compile([
+        r"\b(jailbreak mode|developer mode)\b",
+    ]),
+    "code_injection": _compile([
+        r"\b(drop|truncate|alter)\s+table\b",
+        r"\bunion\s+(all\s+)?select\b",
+        r"'\s*or\s+'?1'?\s*=\s*'?1",
+        r"<\s*(script|iframe)\b",
+        r"\bon(error|load|mouseover)\s*=",
+        r"\$\([^)]*\)|\$\{[^}]*\}|\{\{.*?\}\}",
+        r"\brm\s+-rf\b|/etc/(passwd|shadow)|\.\./\.\./",
+    ]),
+    "system_manipulation": _compile([
+        r"\b(reveal|show|print|repeat|leak|dump|tell me)\b.{0,30}\b(system prompt|your (instructions|prompt)|api[ _-]?keys?|secrets?|environment variables?|env vars?|credentials)\b",
+        r"\b(os\.environ|process\.env|getenv)\b",
+    ]),
+}
+
+# Terms that are fine in many startup ideas but worth a second (LLM) opinion
+REVIEW_PATTERNS = _compile([
+    r"\b(instructions?|prompt|pretend|role-?play|disregard|ignore|override|bypass)\b",
+    r"\b(password|credentials?|secret|token|api[ _-]?key|admin|sudo|root|shell|eval|exec(ute)?)\b",
+    r"\b(hack\w*|malware|ransomware|phish\w*|ddos|keylogger|exploit\w*|botnet|steal\w*|crack\w*)\b",
+    r"\b(illegal|weapons?|drugs?|explosives?|counterfeit)\b",
+    r"\b(user|system|assistant)\s*:",
+    r"\b(ignore|disregard|forget|override)\b.{0,40}\b(instructions?|prompts?|rules|directions|guidelines)\b",
+    r"\byou are now\b",
+    r"\bjailbreak\w*\b",
+    r"javascript\s*:",
+    r"(;|&&|\|\|)\s*(rm|curl|wget|bash|sh|nc|chmod|python3?)\b",
+])
+
+# Characters that never appear in a plain-language idea
+RISKY_CHARACTERS = re.compile(r"[<>{}`$;|\\]")
+
+# Common startup vocabulary; a locally approved prompt must use some of it
+STARTUP_VOCABULARY = frozenset("""
+    ai app apps application platform marketplace saas startup tool tools service services
+    booking bookings subscription dashboard api analytics tracking tracker management
+    manager social network community delivery on-demand rental rentals payments fintech
+    healthtech edtech proptech b2b b2c crm automation automated assistant chatbot
+    scheduling scheduler calendar freelancers customers users businesses business
+    restaurants students teachers developers creators owners small teams remote
+    airbnb uber stripe shopify slack notion spotify netflix tinder linkedin
+    mobile web website online digital smart personalized recommendation recommendations
+    matching marketplace ecommerce e-commerce store shop tutoring fitness health
+    finance budgeting invoicing travel food pet pets real estate learning course courses
+""".split())
+
+_ZERO_WIDTH = re.compile(r"[\u200b-\u200f\u2060\ufeff]")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """NFKC-fold, strip zero-width characters and collapse whitespace so look-alikes match"""
+    text = unicodedata.normalize("NFKC", prompt)
+    text = _ZERO_WIDTH.sub("", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _max_bracket_depth(text: str) -> int:
+    depth = deepest = 0
+    for char in text:
+        if char in "([{":
+            depth += 1
+            deepest = max(deepest, depth)
+        elif char in ")]}" and depth:
+            depth -= 1
+    return deepest
+
+
+def _is_repetitive(tokens: List[str]) -> bool:
+    """Detect prompts padded with one repeated token (a common resource-exhaustion trick)"""
+    if len(tokens) < MIN_TOKENS_FOR_REPETITION_CHECK:
+        return False
+    _, count = Counter(tokens).most_common(1)[0]
+    return count / len(tokens) > MAX_REPEATED_TOKEN_SHARE
+
+
+def classify_prompt(prompt: str) -> Tuple[str, str, str]:
+    """
+    Classify a prompt locally without any network call
+
+    Returns:
+        (verdict, reason, category) where verdict is SAFE, UNSAFE or AMBIGUOUS.
+        AMBIGUOUS prompts should be escalated to the LLM security check.
+    """
+    if len(prompt) > SANITIZE_MAX_PROMPT_CHARS:
+        return UNSAFE, f"Prompt exceeds {SANITIZE_MAX_PROMPT_CHARS} characters", "recursive_input"
+
+    text = normalize_prompt(prompt)
+    lowered = text.lower()
+    tokens = _WORD.findall(lowered)
+
+    if _max_bracket_depth(text) > MAX_BRACKET_DEPTH:
+        return UNSAFE, "Deeply nested brackets look like a recursive payload", "recursive_input"
+    if _is_repetitive(tokens):
+        return UNSAFE, "Prompt is dominated by one repeated token", "recursive_input"
+
+    for category, patterns in BLOCK_PATTERNS.items():
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                return UNSAFE, f"Matched {category.replace('_', ' ')} pattern: \"{match.group(0).strip()[:60]}\"", category
+
+    for category, patterns in ESCALATE_PATTERNS.items():
+        for pattern in patterns:
+            match = pattern.search(text)
+            if match:
+                return AMBIGUOUS, f"Looks like {category.replace('_', ' ')}: \"{match.group(0).strip()[:60]}\"", category
+
+    if not tokens:
+        return AMBIGUOUS, "No words to classify", "unknown"
+    if len(text) > SANITIZE_FAST_PATH_MAX_CHARS:
+        return AMBIGUOUS, "Too long for the fast path", "unknown"
+    if RISKY_CHARACTERS.search(text):
+        return AMBIGUOUS, "Contains code-like characters", "unknown"
+    for pattern in REVIEW_PATTERNS:
+        if pattern.search(text):
+            return AMBIGUOUS, "Contains terms that need review", "unknown"
+    if not STARTUP_VOCABULARY.intersection(tokens):
+        return AMBIGUOUS, "No recognisable startup vocabulary", "unknown"
+
+    return SAFE, "", "safe"
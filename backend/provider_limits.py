@@ -0,0 +1,219 @@
+"""
+Provider Limits - shared concurrency + rate limiting for external APIs
+One limiter per provider (OpenAI, Anthropic, Livepeer, Render), usable from
+async code (`async with`) and from worker threads (`with`)
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Tuple, Union
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate` tokens per second, holding at most `burst`.
+
+    reserve() always succeeds and returns how long the caller must wait for
+    its token, so sync and async callers can sleep in their own way.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class SlotPool:
+    """
+    Counting semaphore shared by worker threads and event loops.
+
+    Waiters queue in one FIFO and a released slot is handed straight to the
+    first of them: a thread is woken through its Event, a coroutine through
+    a future resolved on its own loop. Nobody polls.
+    """
+
+    def __init__(self, size: int):
+        self._free = size
+        self._lock = threading.Lock()
+        self._waiters: Deque[Union[threading.Event, Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = deque()
+
+    def acquire(self) -> None:
+        """Block the calling thread until a slot is free"""
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def acquire_async(self) -> None:
+        """Wait on the running loop until a slot is free"""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return
+            future = loop.create_future()
+            waiter = (loop, future)
+            self._waiters.append(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+            # Already handed a slot: give it back unless _grant will (it
+            # does when the future was cancelled before it ran)
+            if not queued and future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Give a slot back, to the longest waiting caller if there is one"""
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                loop, future = waiter
+                try:
+                    loop.call_soon_threadsafe(self._grant, future)
+                    return
+                except RuntimeError:
+                    # That waiter's loop is closed; try the next one
+                    continue
+            self._free += 1
+
+    def _grant(self, future: asyncio.Future) -> None:
+        if future.done():
+            # The waiter was cancelled in the meantime; pass the slot on
+            self.release()
+        else:
+            future.set_result(None)
+
+
+class ProviderLimiter:
+    """
+    At most max_concurrency calls in flight and rate_per_second call starts
+    (with bursts up to burst) for one provider.
+
+    Usage:
+        async with get_limiter("openai"):
+            await client.chat.completions.create(...)
+
+        with get_limiter("livepeer"):   # from a worker thread
+            livepeer.generate.text_to_image(...)
+    """
+
+    def __init__(self, name: str, max_concurrency: int, rate_per_second: float, burst: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self._slots = SlotPool(max_concurrency)
+        self._bucket = TokenBucket(rate_per_second, burst)
+        self._stats_lock = threading.Lock()
+        self._in_flight = 0
+        self._waited_seconds = 0.0
+        self._calls = 0
+
+    # --- sync (worker threads) ---
+
+    def __enter__(self):
+        started = time.monotonic()
+        self._slots.acquire()
+        time.sleep(self._bucket.reserve())
+        self._started(time.monotonic() - started)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._finished()
+        return False
+
+    # --- async (event loop) ---
+
+    async def __aenter__(self):
+        started = time.monotonic()
+        await self._slots.acquire_async()
+        try:
+            await asyncio.sleep(self._bucket.reserve())
+        except BaseException:
+            self._slots.release()
+            raise
+        self._started(time.monotonic() - started)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._finished()
+        return False
+
+    # --- bookkeeping ---
+
+    def _started(self, waited: float) -> None:
+        with self._stats_lock:
+            self._in_flight += 1
+            self._calls += 1
+            self._waited_seconds += waited
+
+    def _finished(self) -> None:
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "rate_per_second": self._bucket.rate,
+            "burst": self._bucket.burst,
+            "calls": self._calls,
+            "avg_wait_seconds": round(self._waited_seconds / self._calls, 3) if self._calls else 0.0
+        }
+
+
+def _limiter_from_env(name: str, max_concurrency: int, rate_per_second: float, burst: float) -> ProviderLimiter:
+    """Build a limiter, overridable via <NAME>_MAX_CONCURRENCY / _RATE_PER_SECOND / _BURST"""
+    prefix = name.upper()
+    return ProviderLimiter(
+        name,
+        int(os.getenv(f"{prefix}_MAX_CONCURRENCY", str(max_concurrency))),
+        float(os.getenv(f"{prefix}_RATE_PER_SECOND", str(rate_per_second))),
+        float(os.getenv(f"{prefix}_BURST", str(burst)))
+    )
+
+
+LIMITERS: Dict[str, ProviderLimiter] = {
+    "openai": _limiter_from_env("openai", max_concurrency=8, rate_per_second=5.0, burst=10),
+    "anthropic": _limiter_from_env("anthropic", max_concurrency=2, rate_per_second=0.5, burst=2),
+    "livepeer": _limiter_from_env("livepeer", max_concurrency=4, rate_per_second=2.0, burst=4),
+    "render": _limiter_from_env("render", max_concurrency=2, rate_per_second=0.5, burst=2),
+}
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Shared limiter for one provider: openai, anthropic, livepeer or render"""
+    return LIMITERS[provider]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """Per-provider limiter counters"""
+    return {name: limiter.stats() for name, limiter in LIMITERS.items()}
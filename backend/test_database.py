@@ -0,0 +1,83 @@
+"""
+Tests for the SQLite job store: schema migrations and the log cursor
+Run with: python -m pytest -q test_database.py
+"""
+
+import asyncio
+import sqlite3
+
+import database
+
+STEPS = [{"id": 0, "title": "Generating backend code", "status": "pending"}]
+
+
+def _use_database(tmp_path, monkeypatch) -> str:
+    path = str(tmp_path / "hatchr.db")
+    monkeypatch.setattr(database, "DATABASE_PATH", path)
+    return path
+
+
+def _user_version(path: str) -> int:
+    with sqlite3.connect(path) as db:
+        return db.execute("PRAGMA user_version").fetchone()[0]
+
+
+def test_older_schema_is_upgraded_in_place(tmp_path, monkeypatch):
+    path = _use_database(tmp_path, monkeypatch)
+    with sqlite3.connect(path) as db:
+        for version in (1, 2):
+            for statement in database.SCHEMA_MIGRATIONS[version]:
+                db.execute(statement)
+        db.execute("PRAGMA user_version = 2")
+        db.execute(
+            "INSERT INTO jobs (job_id, status, steps, created_at, updated_at) VALUES ('old', 'completed', '[]', 't', 't')"
+        )
+
+    asyncio.run(database.init_database())
+
+    assert _user_version(path) == database.SCHEMA_VERSION
+    with sqlite3.connect(path) as db:
+        assert db.execute("SELECT job_id, owner FROM jobs").fetchall() == [("old", None)]
+        columns = [row[1] for row in db.execute("PRAGMA table_info(enrichment_cache)")]
+    assert "embedding" in columns
+
+
+def test_concurrent_startups_migrate_once(tmp_path, monkeypatch):
+    """Workers booting together all succeed; the ALTER TABLE steps run once"""
+    path = _use_database(tmp_path, monkeypatch)
+
+    async def scenario():
+        await asyncio.gather(*(database.init_database() for _ in range(4)))
+
+    asyncio.run(scenario())
+    asyncio.run(database.init_database())
+    assert _user_version(path) == database.SCHEMA_VERSION
+
+
+def test_log_cursor_and_job_updates(tmp_path, monkeypatch):
+    _use_database(tmp_path, monkeypatch)
+
+    async def scenario():
+        await database.init_database()
+        await database.create_job_record("job", steps=[dict(step) for step in STEPS], status="queued", owner="host:1")
+        entries = [await database.append_job_log("job", f"line {i}") for i in range(5)]
+        assert [entry["message"] for entry in entries] == [f"line {i}" for i in range(5)]
+        assert await database.append_job_log("missing", "dropped") is None
+
+        full = await database.get_job_record("job")
+        assert full["logs"] == entries
+        cursor = entries[2]["seq"]
+        assert (await database.get_job_record("job", since_seq=cursor))["logs"] == entries[3:]
+        assert (await database.get_job_record("job", since_seq=entries[-1]["seq"]))["logs"] == []
+
+        await database.update_job_step("job", 0, "completed")
+        await database.update_job_record("job", status="processing", progress=40)
+        job = await database.get_job_record("job")
+        assert (job["status"], job["progress"], job["steps"][0]["status"]) == ("processing", 40, "completed")
+
+        assert await database.job_exists("job") and not await database.job_exists("missing")
+        assert await database.list_unfinished_jobs() == [("job", "host:1")]
+        await database.update_job_record("job", status="completed")
+        assert await database.list_unfinished_jobs() == []
+
+    asyncio.run(scenario())
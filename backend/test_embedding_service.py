@@ -0,0 +1,65 @@
+"""
+Tests for embed_text()'s batched disk cache writes
+Run with: python -m pytest -q test_embedding_service.py
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+import embedding_service
+from embedding_store import EmbeddingStore, text_hash
+
+TEXTS = ["alpha", "beta", "gamma"]
+
+
+@pytest.fixture
+def disk_cache(tmp_path, monkeypatch):
+    """A disk cache holding TEXTS (oldest first) and a fresh write buffer"""
+    path = str(tmp_path / "emb")
+    store = EmbeddingStore(path, embedding_service.EMBEDDING_MODEL)
+    store.put_many([text_hash(text, embedding_service.EMBEDDING_MODEL) for text in TEXTS], np.eye(3, dtype=np.float32))
+
+    monkeypatch.setattr(embedding_service, "EMBEDDING_CACHE_PATH", path)
+    monkeypatch.setattr(embedding_service, "_disk_cache", store)
+    monkeypatch.setattr(embedding_service, "_memory_cache", embedding_service.TTLCache(16))
+    monkeypatch.setattr(embedding_service, "_disk_pending", {})
+    monkeypatch.setattr(embedding_service, "_disk_touched", {})
+    monkeypatch.setattr(embedding_service, "_disk_flush_task", None)
+    # asyncio primitives bind to the first loop that uses them
+    monkeypatch.setattr(embedding_service, "_disk_lock", asyncio.Lock())
+    monkeypatch.setattr(embedding_service, "_disk_flush_due", asyncio.Event())
+    return path
+
+
+def test_cache_hits_alone_are_persisted(disk_cache):
+    """A flush with hits but no new embeddings still records the use order"""
+    async def scenario():
+        await embedding_service.embed_text("alpha")
+        # Served from memory this time, but still counts as a use
+        await embedding_service.embed_text("alpha")
+        assert embedding_service._disk_flush_task is not None
+        await embedding_service.flush_disk_cache()
+
+    asyncio.run(scenario())
+    reopened = EmbeddingStore(disk_cache, embedding_service.EMBEDDING_MODEL)
+    expected = [text_hash(text, embedding_service.EMBEDDING_MODEL) for text in ["beta", "gamma", "alpha"]]
+    assert reopened.keys() == expected
+
+
+def test_failed_flush_does_not_kill_the_background_task(disk_cache, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("disk on fire")
+
+    monkeypatch.setattr(embedding_service, "_persist_embeddings", broken)
+    monkeypatch.setattr(embedding_service, "EMBEDDING_CACHE_FLUSH_SECONDS", 0.01)
+
+    async def scenario():
+        embedding_service._buffer_embedding("key", np.ones(3, dtype=np.float32))
+        task = embedding_service._disk_flush_task
+        await task
+        assert task.exception() is None
+        assert embedding_service._disk_pending == {}
+
+    asyncio.run(scenario())
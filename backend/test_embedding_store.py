@@ -0,0 +1,105 @@
+"""
+Tests for the memory-mapped embedding store
+Run with: python -m pytest -q test_embedding_store.py
+"""
+
+import os
+
+import numpy as np
+
+from embedding_store import EmbeddingStore, text_hash
+
+MODEL = "test-model"
+
+
+def _unit(rows: np.ndarray) -> np.ndarray:
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+def test_round_trip_through_sidecar_and_memmap(tmp_path):
+    path = str(tmp_path / "emb")
+    keys = [text_hash(f"text {i}", MODEL) for i in range(10)]
+    vectors = np.random.default_rng(0).standard_normal((10, 8)).astype(np.float32)
+
+    store = EmbeddingStore(path, MODEL)
+    store.put_many(keys[:6], vectors[:6])
+    store.put_many(keys[6:], vectors[6:])
+
+    reopened = EmbeddingStore(path, MODEL)
+    assert len(reopened) == 10
+    assert reopened.missing(keys + ["unknown"]) == ["unknown"]
+    assert np.allclose(reopened.gather(keys), _unit(vectors), atol=1e-6)
+    assert np.allclose(reopened.get(keys[3]), _unit(vectors)[3], atol=1e-6)
+
+    # A different model never reuses the stored vectors
+    assert len(EmbeddingStore(path, "other-model")) == 0
+
+
+def test_compact_keeps_only_live_rows(tmp_path):
+    path = str(tmp_path / "emb")
+    keys = [text_hash(f"text {i}", MODEL) for i in range(10)]
+    vectors = np.random.default_rng(1).standard_normal((10, 8)).astype(np.float32)
+
+    store = EmbeddingStore(path, MODEL)
+    store.put_many(keys, vectors)
+    keep = keys[7:]
+    store.compact(keep)
+
+    assert store.keys() == keep
+    assert os.path.exists(f"{path}.1.f32") and not os.path.exists(f"{path}.f32")
+    reopened = EmbeddingStore(path, MODEL)
+    assert reopened.keys() == keep
+    assert np.allclose(reopened.gather(keep), _unit(vectors)[7:], atol=1e-6)
+
+    # Appending after a compaction lands in the new generation's file
+    reopened.put_many([keys[0]], vectors[:1])
+    assert np.allclose(EmbeddingStore(path, MODEL).get(keys[0]), _unit(vectors)[0], atol=1e-6)
+
+
+def test_touch_orders_keys_by_last_use(tmp_path):
+    path = str(tmp_path / "emb")
+    keys = [text_hash(f"text {i}", MODEL) for i in range(4)]
+    store = EmbeddingStore(path, MODEL)
+    store.put_many(keys, np.eye(4, dtype=np.float32))
+
+    store.touch([keys[0]])
+    store.put_many([keys[1]], np.eye(4, dtype=np.float32)[1:2])
+    assert store.keys() == [keys[2], keys[3], keys[0], keys[1]]
+    assert EmbeddingStore(path, MODEL).keys() == store.keys()
+
+
+def test_append_after_torn_row_and_log_line(tmp_path):
+    """A crash mid-append leaves a partial row / log line; later rows stay aligned"""
+    path = str(tmp_path / "emb")
+    keys = [text_hash(f"text {i}", MODEL) for i in range(4)]
+    vectors = np.random.default_rng(2).standard_normal((4, 8)).astype(np.float32)
+
+    store = EmbeddingStore(path, MODEL)
+    store.put_many(keys[:1], vectors[:1])
+    store.put_many(keys[1:2], vectors[1:2])
+    with open(f"{path}.f32", "ab") as fh:
+        fh.write(b"\x01" * 6)
+    with open(f"{path}.log", "a", encoding="utf-8") as fh:
+        fh.write(f"{keys[3]} 9")
+
+    reopened = EmbeddingStore(path, MODEL)
+    assert reopened.keys() == keys[:2]
+    reopened.put_many(keys[2:3], vectors[2:3])
+
+    final = EmbeddingStore(path, MODEL)
+    assert final.keys() == keys[:3]
+    assert np.allclose(final.gather(keys[:3]), _unit(vectors)[:3], atol=1e-6)
+
+
+def test_puts_append_to_the_log_instead_of_rewriting_the_sidecar(tmp_path):
+    path = str(tmp_path / "emb")
+    vectors = np.eye(8, dtype=np.float32)
+    store = EmbeddingStore(path, MODEL)
+    store.put_many(["k0"], vectors[:1])
+    sidecar = os.path.getmtime(f"{path}.json"), os.path.getsize(f"{path}.json")
+
+    for i in range(1, 8):
+        store.put_many([f"k{i}"], vectors[i:i + 1])
+
+    assert (os.path.getmtime(f"{path}.json"), os.path.getsize(f"{path}.json")) == sidecar
+    assert EmbeddingStore(path, MODEL).keys() == [f"k{i}" for i in range(8)]
@@ -0,0 +1,126 @@
+"""
+Tests for the GPT-4o enrichment cache
+Run with: python -m pytest -q test_enrichment_cache.py
+"""
+
+import asyncio
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import database
+import generation_service
+from generation_service import PromptEnricher, enrichment_cache_key
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions; every call returns a new spec"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        spec = {"project_name": f"Spec {self.calls}", "enriched_prompt": kwargs["messages"][-1]["content"]}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(spec)))])
+
+
+@pytest.fixture
+def gpt(tmp_path, monkeypatch):
+    """Fresh cache database and a counting GPT-4o stand-in"""
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "hatchr.db"))
+    asyncio.run(database.init_database())
+
+    completions = FakeCompletions()
+    monkeypatch.setattr(generation_service, "get_openai_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    monkeypatch.setattr(generation_service, "ENRICHMENT_SEMANTIC_CACHE", False)
+    monkeypatch.setattr(PromptEnricher, "_semantic_index", None)
+    monkeypatch.setattr(PromptEnricher, "_semantic_index_lock", asyncio.Lock())
+    return completions
+
+
+def test_resubmitted_ideas_are_served_from_the_cache(gpt):
+    async def scenario():
+        first = await PromptEnricher.enrich_prompt("Airbnb for dogs")
+        # Case, spacing and trailing punctuation don't change the key
+        assert await PromptEnricher.enrich_prompt("  airbnb   for DOGS!") == first
+        assert gpt.calls == 1
+
+        await PromptEnricher.enrich_prompt("Uber for boats")
+        assert await PromptEnricher.enrich_prompt("Airbnb for dogs", use_cache=False) != first
+        assert gpt.calls == 3
+
+    asyncio.run(scenario())
+
+
+def test_expired_and_evicted_specs_are_regenerated(gpt, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(database.time, "time", lambda: now[0])
+    monkeypatch.setattr(generation_service, "ENRICHMENT_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(generation_service, "ENRICHMENT_CACHE_MAX_ENTRIES", 2)
+
+    async def scenario():
+        await PromptEnricher.enrich_prompt("idea a")
+        now[0] += 61
+        await PromptEnricher.enrich_prompt("idea a")
+        assert gpt.calls == 2
+
+        # "idea a" was used most recently, so "idea b" is evicted by "idea c"
+        now[0] += 1
+        await PromptEnricher.enrich_prompt("idea b")
+        now[0] += 1
+        await PromptEnricher.enrich_prompt("idea a")
+        now[0] += 1
+        await PromptEnricher.enrich_prompt("idea c")
+        assert gpt.calls == 4
+        assert await database.get_cached_enrichment(enrichment_cache_key("idea b"), 60) is None
+        assert await database.get_cached_enrichment(enrichment_cache_key("idea a"), 60) is not None
+
+    asyncio.run(scenario())
+
+
+def test_reworded_ideas_reuse_the_closest_spec(gpt, monkeypatch):
+    # Unit vectors: the two dog ideas are 0.99 similar, boats are orthogonal
+    vectors = {
+        "airbnb for dogs": np.array([1.0, 0.0, 0.0]),
+        "airbnb for puppies": np.array([0.99, np.sqrt(1 - 0.99 ** 2), 0.0]),
+        "uber for boats": np.array([0.0, 0.0, 1.0]),
+    }
+    embedded = []
+
+    async def fake_embed(text):
+        embedded.append(text)
+        return vectors[text].astype(np.float32)
+
+    monkeypatch.setattr(generation_service, "embed_text", fake_embed)
+    monkeypatch.setattr(generation_service, "ENRICHMENT_SEMANTIC_CACHE", True)
+    monkeypatch.setattr(generation_service, "ENRICHMENT_SEMANTIC_THRESHOLD", 0.95)
+
+    async def scenario():
+        original = await PromptEnricher.enrich_prompt("Airbnb for dogs")
+        assert await PromptEnricher.enrich_prompt("Airbnb for puppies") == original
+        assert (gpt.calls, PromptEnricher._semantic_index is not None) == (1, True)
+
+        # The alias makes the rewording an exact hit: no second embedding call
+        assert await PromptEnricher.enrich_prompt("airbnb for puppies!") == original
+        assert embedded == ["airbnb for dogs", "airbnb for puppies"]
+
+        assert await PromptEnricher.enrich_prompt("Uber for boats") != original
+        assert gpt.calls == 2
+
+    asyncio.run(scenario())
+
+    # The alias expires with the spec it copies
+    with sqlite3.connect(database.DATABASE_PATH) as db:
+        created = dict(db.execute("SELECT cache_key, created_at FROM enrichment_cache"))
+    assert created[enrichment_cache_key("airbnb for puppies")] == created[enrichment_cache_key("airbnb for dogs")]
+
+    # A fresh process rebuilds the index from the stored embeddings
+    monkeypatch.setattr(PromptEnricher, "_semantic_index", None)
+    monkeypatch.setattr(PromptEnricher, "_semantic_index_lock", asyncio.Lock())
+    vectors["dog hotel marketplace"] = np.array([0.98, 0.0, np.sqrt(1 - 0.98 ** 2)])
+    assert asyncio.run(PromptEnricher.enrich_prompt("Dog hotel marketplace"))["project_name"] == "Spec 1"
+    assert gpt.calls == 2
@@ -0,0 +1,65 @@
+"""
+Tests for loading and hot-reloading the founder directory file
+Run with: python -m pytest -q test_founder_directory.py
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import main
+
+FOUNDERS = [
+    {"name": "Ada", "skills": ["python", "ml"], "experienceLevel": "senior"},
+    {"name": "Lin", "skills": ["sales"], "experienceLevel": "junior"},
+]
+
+
+@pytest.fixture
+def directory_file(tmp_path, monkeypatch):
+    path = tmp_path / "founders.json"
+    monkeypatch.setattr(main, "COFOUNDER_DATA_PATH", str(path))
+    monkeypatch.setattr(main, "FOUNDER_DIRECTORY_POLL_SECONDS", 0.01)
+    monkeypatch.setattr(main, "_founder_directory", None)
+    monkeypatch.setattr(main, "_founder_directory_signature", None)
+    monkeypatch.setattr(main, "_cofounder_index", None)
+    monkeypatch.setattr(main, "_cofounder_cache_lock", asyncio.Lock())
+    return path
+
+
+async def _watch_briefly():
+    watcher = asyncio.create_task(main._watch_founder_directory())
+    await asyncio.sleep(0.1)
+    watcher.cancel()
+
+
+@pytest.mark.parametrize("initial", [None, "[]"])
+def test_founders_added_after_an_empty_start_are_picked_up(directory_file, initial):
+    if initial is not None:
+        directory_file.write_text(initial, encoding="utf-8")
+
+    async def scenario():
+        founders, attributes = await asyncio.to_thread(main._load_founder_directory)
+        assert founders == [] and len(attributes) == 0
+
+        directory_file.write_text(json.dumps(FOUNDERS), encoding="utf-8")
+        await _watch_briefly()
+
+        founders, attributes = main._load_founder_directory()
+        assert [founder["name"] for founder in founders] == ["Ada", "Lin"]
+        assert list(attributes.matching_rows(["python"], None)) == [0]
+        assert main._founder_directory_signature == main._directory_signature()
+
+    asyncio.run(scenario())
+
+
+def test_loaded_directory_is_not_reparsed(directory_file, monkeypatch):
+    directory_file.write_text(json.dumps(FOUNDERS), encoding="utf-8")
+    first = main._load_founder_directory()
+
+    def fail():
+        raise AssertionError("directory file parsed again")
+
+    monkeypatch.setattr(main, "_load_cofounder_seed", fail)
+    assert main._load_founder_directory() is first
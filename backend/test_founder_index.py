@@ -0,0 +1,110 @@
+"""
+Tests for the founder index: swap-delete bookkeeping and the IVF ANN index
+Run with: python -m pytest -q test_founder_index.py
+"""
+
+import random
+
+import numpy as np
+
+from ann_index import IVFIndex
+import founder_index
+from founder_index import FounderIndex, AttributeIndex, normalize_rows
+
+SKILLS = ["python", "react", "sales", "design", "ml", "go"]
+LEVELS = ["junior", "senior", "expert"]
+
+
+def _founder(rng: random.Random, name: str) -> dict:
+    return {
+        "name": name,
+        "skills": rng.sample(SKILLS, rng.randint(1, 3)),
+        "experienceLevel": rng.choice(LEVELS),
+    }
+
+
+def test_swap_delete_matches_rebuild():
+    """Random adds/removes leave the same state as building from the survivors"""
+    rng = random.Random(7)
+    vectors = np.random.default_rng(7).standard_normal((400, 16)).astype(np.float32)
+
+    index = FounderIndex([], np.empty((0, 16), dtype=np.float32))
+    index.ann = IVFIndex.train(vectors, n_lists=8)
+    embeddings = {}
+    for step in range(400):
+        if index.founders and rng.random() < 0.35:
+            row = rng.randrange(len(index))
+            embeddings.pop(index.founders[row]["name"])
+            index.remove(row)
+        else:
+            founder = _founder(rng, f"f{step}")
+            embeddings[founder["name"]] = vectors[step]
+            index.add(founder, vectors[step])
+
+    names = [founder["name"] for founder in index.founders]
+    assert sorted(names) == sorted(embeddings)
+    expected = normalize_rows(np.array([embeddings[name] for name in names]))
+    assert np.allclose(index.matrix, expected, atol=1e-6)
+
+    rebuilt = AttributeIndex(index.founders)
+    for skill in SKILLS:
+        assert np.array_equal(index.attributes.skill_overlap([skill]), rebuilt.skill_overlap([skill]))
+    for level in LEVELS:
+        assert np.array_equal(index.attributes.matching_rows(None, [level]), rebuilt.matching_rows(None, [level]))
+
+    # Every row is in the ANN index exactly once, under its current row id
+    ids = np.sort(np.concatenate(index.ann._ids))
+    assert np.array_equal(ids, np.arange(len(index)))
+    for row in range(len(index)):
+        found, _ = index.ann.search(index.matrix[row], 1, nprobe=index.ann.n_lists)
+        assert np.allclose(index.matrix[found[0]], index.matrix[row], atol=1e-6)
+
+
+def test_ann_full_nprobe_matches_exact():
+    """Scanning every list is exact search"""
+    rng = np.random.default_rng(3)
+    vectors = normalize_rows(rng.standard_normal((2000, 32)).astype(np.float32))
+    ann = IVFIndex.build(vectors, n_lists=16)
+
+    for query in rng.standard_normal((20, 32)).astype(np.float32):
+        ids, scores = ann.search(query, 10, nprobe=ann.n_lists)
+        exact = vectors @ (query / np.linalg.norm(query))
+        expected = np.argsort(-exact, kind="stable")[:10]
+        assert np.array_equal(ids, expected)
+        assert np.allclose(scores, exact[expected], atol=1e-5)
+
+
+def test_filtered_search_matches_brute_force(monkeypatch):
+    """Sparse bonus/filter evaluation gives the dense reference ranking, with and without ANN"""
+    # Send filtered queries through the ANN path too
+    monkeypatch.setattr(founder_index, "FOUNDER_FILTER_EXACT_MAX", 0)
+    rng = random.Random(5)
+    founders = [_founder(rng, f"f{i}") for i in range(3000)]
+    vectors = normalize_rows(np.random.default_rng(5).standard_normal((3000, 16)).astype(np.float32))
+    index = FounderIndex(founders, vectors)
+    query = np.random.default_rng(6).standard_normal(16).astype(np.float32)
+    query /= np.linalg.norm(query)
+
+    cases = [
+        dict(skills=["python", "ml"], skill_weight=0.2),
+        dict(skills=["sales"], skill_weight=0.1, required_skills=["design"]),
+        dict(required_skills=["python", "react"], experience_levels=["senior", "expert"]),
+        dict(skills=["go"], skill_weight=0.3, experience_levels=["junior"]),
+    ]
+    for case in cases:
+        scores = vectors @ query
+        for skill in case.get("skills", []):
+            has = np.array([skill in f["skills"] for f in founders])
+            scores = scores + has * case["skill_weight"] / len(case["skills"])
+        keep = np.ones(len(founders), dtype=bool)
+        for skill in case.get("required_skills", []):
+            keep &= np.array([skill in f["skills"] for f in founders])
+        if case.get("experience_levels"):
+            keep &= np.array([f["experienceLevel"] in case["experience_levels"] for f in founders])
+        expected = [founders[i]["name"] for i in np.flatnonzero(keep)[np.argsort(-scores[keep], kind="stable")][:10]]
+
+        index.ann = None
+        assert [f["name"] for f, _ in index.search(query, 10, **case)] == expected
+        index.ann = IVFIndex.build(vectors, n_lists=8)
+        got = index.search(query, 10, nprobe=8, **case)
+        assert [f["name"] for f, _ in got] == expected
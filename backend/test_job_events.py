@@ -0,0 +1,87 @@
+"""
+Tests for the job progress Server-Sent Events stream
+Run with: python -m pytest -q test_job_events.py
+"""
+
+import asyncio
+import json
+
+import database
+import main
+from job_events import job_events
+
+STEPS = [
+    {"id": 0, "title": "Generating backend code", "status": "pending"},
+    {"id": 1, "title": "Deploying", "status": "pending"},
+]
+
+
+def _parse(message: str):
+    """(event, data) of one SSE message, or None for a keep-alive comment"""
+    if message.startswith(":"):
+        return None
+    event, data = message.strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+async def _new_job(tmp_path, monkeypatch, job_id="job"):
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "jobs.db"))
+    await database.init_database()
+    await database.create_job_record(job_id, steps=[dict(step) for step in STEPS])
+
+
+def test_live_events_follow_the_snapshot(tmp_path, monkeypatch):
+    async def scenario():
+        await _new_job(tmp_path, monkeypatch)
+        await main.add_log("job", "before")
+        stream = main._job_event_stream("job")
+
+        event, snapshot = _parse(await stream.__anext__())
+        assert event == "snapshot" and [log["message"] for log in snapshot["logs"]] == ["before"]
+        assert job_events.subscriber_count("job") == 1
+
+        await main.add_log("job", "during")
+        event, entry = _parse(await stream.__anext__())
+        # The live entry is the stored row, seq and timestamp included
+        assert (event, entry) == ("log", (await database.get_job_record("job"))["logs"][-1])
+
+        await main.update_step_status("job", 0, "in_progress")
+        assert _parse(await stream.__anext__()) == ("step", {"id": 0, "status": "in_progress"})
+        await main.set_job_status("job", "completed", project_id="p1", project_name="Demo")
+        assert _parse(await stream.__anext__()) == (
+            "status", {"status": "completed", "project_id": "p1", "project_name": "Demo"}
+        )
+
+        # The stream ends on a terminal status and drops its subscription
+        assert [message async for message in stream] == []
+        assert job_events.subscriber_count("job") == 0
+
+    asyncio.run(scenario())
+
+
+def test_stream_polls_the_store_for_jobs_in_another_worker(tmp_path, monkeypatch):
+    """Updates written by another process never reach the broker; the stream still sees them"""
+    monkeypatch.setattr(main, "SSE_KEEPALIVE_SECONDS", 0.01)
+
+    async def scenario():
+        await _new_job(tmp_path, monkeypatch)
+        stream = main._job_event_stream("job")
+        assert _parse(await stream.__anext__())[0] == "snapshot"
+
+        # Nothing changed: only a keep-alive
+        assert _parse(await stream.__anext__()) is None
+
+        # Store writes without publishing, as another worker would make them
+        await database.append_job_log("job", "from another worker")
+        await database.update_job_step("job", 0, "completed")
+        await database.update_job_record("job", progress=50)
+        events = [_parse(await stream.__anext__()) for _ in range(3)]
+        assert events[0][0] == "log" and events[0][1]["message"] == "from another worker"
+        assert events[1:] == [("step", {"id": 0, "status": "completed"}), ("progress", {"progress": 50})]
+
+        # A live event the poll already delivered isn't sent twice
+        job_events.publish("job", "progress", {"progress": 50})
+        await database.update_job_record("job", status="failed")
+        assert [_parse(message) async for message in stream] == [("status", {"status": "failed"})]
+
+    asyncio.run(scenario())
@@ -0,0 +1,59 @@
+"""
+Tests for the job scheduler's bounded queue and queue positions
+Run with: python -m pytest -q test_job_scheduler.py
+"""
+
+import asyncio
+
+import pytest
+
+from job_scheduler import JobScheduler, QueueFullError
+
+
+async def _noop(*args):
+    return None
+
+
+def test_queue_full_and_positions():
+    async def scenario():
+        scheduler = JobScheduler(workers=1, max_queue=3)
+        positions = [await scheduler.submit(f"job{i}", _noop) for i in range(3)]
+        assert positions == [1, 2, 3]
+        assert [scheduler.position(f"job{i}") for i in range(3)] == [1, 2, 3]
+        assert scheduler.is_full()
+
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("job3", _noop)
+        assert scheduler.position("job3") is None
+
+        assert await scheduler.stop() == ["job0", "job1", "job2"]
+
+    asyncio.run(scenario())
+
+
+def test_positions_advance_as_workers_start_jobs():
+    async def scenario():
+        scheduler = JobScheduler(workers=1, max_queue=5)
+        release = asyncio.Event()
+        started = []
+
+        async def runner(job_id):
+            started.append(job_id)
+            await release.wait()
+
+        scheduler.start()
+        # Concurrent submits still get distinct, gap-free positions
+        positions = await asyncio.gather(*(scheduler.submit(f"job{i}", runner, f"job{i}") for i in range(4)))
+        assert sorted(positions) == [1, 2, 3, 4]
+
+        await asyncio.sleep(0.01)
+        assert started == ["job0"]
+        assert scheduler.position("job0") is None
+        assert [scheduler.position(f"job{i}") for i in range(1, 4)] == [1, 2, 3]
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert started == ["job0", "job1", "job2", "job3"]
+        assert await scheduler.stop() == []
+
+    asyncio.run(scenario())
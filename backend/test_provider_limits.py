@@ -0,0 +1,81 @@
+"""
+Tests for the shared provider limiters: slot hand-off order and the token bucket
+Run with: python -m pytest -q test_provider_limits.py
+"""
+
+import asyncio
+import threading
+
+import provider_limits
+from provider_limits import ProviderLimiter, SlotPool, TokenBucket
+
+
+def test_released_slots_go_to_waiters_in_arrival_order():
+    async def scenario():
+        pool = SlotPool(1)
+        await pool.acquire_async()
+        order = []
+
+        async def waiter(name):
+            await pool.acquire_async()
+            order.append(name)
+            pool.release()
+
+        tasks = []
+        for name in ["a", "b", "c"]:
+            tasks.append(asyncio.create_task(waiter(name)))
+            await asyncio.sleep(0)
+
+        # A thread queued behind the coroutines is served after them
+        thread = threading.Thread(target=lambda: (pool.acquire(), order.append("thread"), pool.release()))
+        thread.start()
+        while len(pool._waiters) < 4:
+            await asyncio.sleep(0.001)
+
+        pool.release()
+        await asyncio.gather(*tasks)
+        await asyncio.to_thread(thread.join)
+        assert order == ["a", "b", "c", "thread"]
+        assert (pool._free, len(pool._waiters)) == (1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiters_never_leak_a_slot():
+    async def scenario():
+        limiter = ProviderLimiter("test", max_concurrency=2, rate_per_second=0, burst=1)
+        running = [0]
+        peak = [0]
+
+        async def call():
+            async with limiter:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+                await asyncio.sleep(0.001)
+                running[0] -= 1
+
+        tasks = [asyncio.create_task(call()) for _ in range(60)]
+        await asyncio.sleep(0)
+        for task in tasks[5::3]:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        assert peak[0] == 2
+        assert (limiter._slots._free, len(limiter._slots._waiters)) == (2, 0)
+        assert limiter.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket_allows_a_burst_then_spaces_calls(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(provider_limits.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(rate=2.0, burst=3)
+
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # Each call past the burst waits one more token interval
+    assert [bucket.reserve() for _ in range(2)] == [0.5, 1.0]
+
+    now[0] += 10
+    assert bucket.reserve() == 0.0
+    assert TokenBucket(rate=0, burst=1).reserve() == 0.0
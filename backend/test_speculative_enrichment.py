@@ -0,0 +1,115 @@
+"""
+Tests for enrichment started speculatively alongside the security check
+Run with: python -m pytest -q test_speculative_enrichment.py
+"""
+
+import asyncio
+import gc
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import database
+import generation_service
+import main
+from generation_service import PromptEnricher, enrichment_cache_key
+
+STEPS = [{"id": i, "title": f"Step {i}", "status": "pending"} for i in range(5)]
+
+
+class FakeCompletions:
+    """Stands in for client.chat.completions, answering after a short delay"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        spec = {"project_name": "Speculative", "enriched_prompt": "spec"}
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(spec)))])
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch):
+    """A job record, a counting GPT-4o stand-in and a stopped-after-enrichment pipeline"""
+    monkeypatch.setattr(database, "DATABASE_PATH", str(tmp_path / "hatchr.db"))
+    monkeypatch.setattr(main, "SPECULATIVE_ENRICHMENT", True)
+    monkeypatch.setattr(generation_service, "ENRICHMENT_SEMANTIC_CACHE", False)
+
+    completions = FakeCompletions()
+    monkeypatch.setattr(generation_service, "get_openai_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+
+    consumed = []
+
+    async def generate_startup_backend(user_idea, job_id, log_callback, enrichment=None):
+        consumed.append(await enrichment)
+        raise RuntimeError("stop after enrichment")
+
+    monkeypatch.setattr(main, "generate_startup_backend", generate_startup_backend)
+
+    async def setup():
+        await database.init_database()
+        await database.create_job_record("job", steps=[dict(step) for step in STEPS])
+
+    asyncio.run(setup())
+    return SimpleNamespace(completions=completions, consumed=consumed)
+
+
+def _sanitizer(is_safe: bool, delay: float):
+    async def sanitize_prompt(prompt):
+        await asyncio.sleep(delay)
+        return is_safe, "" if is_safe else "looks like an attack"
+    return sanitize_prompt
+
+
+def test_approved_prompt_uses_and_caches_the_speculative_spec(pipeline, monkeypatch):
+    monkeypatch.setattr(main, "sanitize_prompt", _sanitizer(True, 0.05))
+
+    async def scenario():
+        await main.process_generation("job", "Airbnb for dogs", False)
+        cached = await database.get_cached_enrichment(enrichment_cache_key("Airbnb for dogs"), 60)
+        return cached
+
+    cached = asyncio.run(scenario())
+    # The spec GPT-4o produced during the check is the one the pipeline got
+    assert pipeline.completions.calls == 1
+    assert pipeline.consumed == [cached] and cached["project_name"] == "Speculative"
+
+
+@pytest.mark.parametrize("delay", [0.0, 0.05])
+def test_rejected_prompt_is_never_cached(pipeline, monkeypatch, delay):
+    """Whether the check finishes before or after GPT-4o, nothing is written"""
+    monkeypatch.setattr(main, "sanitize_prompt", _sanitizer(False, delay))
+
+    async def scenario():
+        await main.process_generation("job", "Airbnb for dogs", False)
+        # Give a stray enrichment task time to finish if it was not cancelled
+        await asyncio.sleep(0.05)
+        job = await database.get_job_record("job")
+        cached = await database.get_cached_enrichment(enrichment_cache_key("Airbnb for dogs"), 60)
+        return job, cached
+
+    job, cached = asyncio.run(scenario())
+    assert job["status"] == "failed" and cached is None
+    assert pipeline.consumed == []
+
+
+def test_failed_speculation_leaves_no_unretrieved_exception(pipeline, monkeypatch):
+    async def broken(prompt, approval):
+        raise RuntimeError("GPT-4o unavailable")
+
+    monkeypatch.setattr(main, "_speculative_enrichment", broken)
+    monkeypatch.setattr(main, "sanitize_prompt", _sanitizer(False, 0.02))
+    reported = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context))
+        await main.process_generation("job", "Airbnb for dogs", False)
+        gc.collect()
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    gc.collect()
+    assert reported == []
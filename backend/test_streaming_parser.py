@@ -0,0 +1,126 @@
+"""
+Tests for the streaming FILE: / code-fence parser and the generated-code cache
+Run with: python -m pytest -q test_streaming_parser.py
+"""
+
+import random
+
+import pytest
+
+import generation_service
+from generation_service import StreamingFileParser, CodeCache
+
+RESPONSE = """Here is the project.
+
+FILE: main.py
+```python
+
+from fastapi import FastAPI
+app = FastAPI()
+
+@app.get("/")
+def root():
+    return {"ok": True}
+
+```
+
+FILE: requirements.txt
+```
+fastapi
+uvicorn
+```
+FILE: app/models.py
+```python
+class Item:
+    pass
+```"""
+
+
+def _parse(chunks, output_dir=None):
+    parser = StreamingFileParser(output_dir)
+    completed = []
+    for chunk in chunks:
+        completed += parser.feed(chunk)
+    completed += parser.close()
+    return parser, completed
+
+
+def test_chunk_boundaries_do_not_change_the_result():
+    whole, whole_completed = _parse([RESPONSE])
+    assert set(whole.files) == {"main.py", "requirements.txt", "app/models.py"}
+    assert whole.files["requirements.txt"] == "fastapi\nuvicorn"
+    assert whole.files["main.py"].startswith("from fastapi") and whole.files["main.py"].endswith("True}")
+
+    # Every two-way split, then random chunkings
+    for split in range(len(RESPONSE) + 1):
+        parser, completed = _parse([RESPONSE[:split], RESPONSE[split:]])
+        assert parser.files == whole.files
+        assert completed == whole_completed
+
+    rng = random.Random(11)
+    for _ in range(50):
+        chunks, rest = [], RESPONSE
+        while rest:
+            size = rng.randint(1, 12)
+            chunks.append(rest[:size])
+            rest = rest[size:]
+        parser, completed = _parse(chunks)
+        assert parser.files == whole.files
+        assert completed == whole_completed
+
+
+def test_disk_output_matches_memory_output(tmp_path):
+    memory, _ = _parse([RESPONSE])
+    _parse([RESPONSE[i:i + 7] for i in range(0, len(RESPONSE), 7)], output_dir=tmp_path)
+    for name, content in memory.files.items():
+        assert (tmp_path / name).read_text(encoding="utf-8") == content
+
+
+def test_paths_outside_the_project_are_refused(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    with pytest.raises(ValueError):
+        _parse(["FILE: ../escape.py\n```\nprint('x')\n```\n"], output_dir=project)
+    assert not (tmp_path / "escape.py").exists()
+
+    for filename in ["../escape.py", "/etc/passwd", "a/../../escape.py"]:
+        with pytest.raises(ValueError):
+            CodeCache._contained(project, filename)
+    assert CodeCache._contained(project, "app/models.py") == (project / "app" / "models.py").resolve()
+
+
+SPEC = {
+    "project_name": "ShelfShare",
+    "description": "Lend books to neighbours",
+    "enriched_prompt": "A book lending API",
+    "database_schema": "books(id, title, owner)",
+    "api_endpoints": ["GET /books", "POST /books"],
+    "key_features": ["Lending"],
+}
+
+
+def test_cache_key_covers_every_prompt_field():
+    key = CodeCache.key_for(SPEC)
+    assert CodeCache.key_for(dict(SPEC)) == key
+    # Fields that only reach the README still change the generated files
+    for field, value in [("project_name", "BookLoop"), ("description", "Swap books")]:
+        assert CodeCache.key_for({**SPEC, field: value}) != key
+    # Spec fields the prompt never uses don't split the cache
+    assert CodeCache.key_for({**SPEC, "example_companies": ["Libib"]}) == key
+
+
+def test_cached_files_are_copied_into_new_projects(tmp_path, monkeypatch):
+    monkeypatch.setattr(generation_service, "CODE_CACHE_DIR", tmp_path / "cache")
+    source = tmp_path / "first"
+    _parse([RESPONSE], output_dir=source)
+    sizes = {name: len((source / name).read_text(encoding="utf-8")) for name in ["main.py", "app/models.py"]}
+    key = CodeCache.key_for(SPEC)
+
+    assert CodeCache.copy_into(key, tmp_path / "miss") is None
+    CodeCache.store_dir(key, source, sizes)
+    assert CodeCache.copy_into(key, tmp_path / "second") == sizes
+
+    # A copy, not a link: editing the project leaves the cache entry intact
+    (tmp_path / "second" / "main.py").write_text("edited", encoding="utf-8")
+    CodeCache.copy_into(key, tmp_path / "third")
+    assert (tmp_path / "third" / "main.py").read_text(encoding="utf-8") == (source / "main.py").read_text(encoding="utf-8")
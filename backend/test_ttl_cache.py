@@ -0,0 +1,39 @@
+"""
+Tests for the in-process TTL/LRU cache
+Run with: python -m pytest -q test_ttl_cache.py
+"""
+
+import ttl_cache
+from ttl_cache import TTLCache
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ttl_cache.time, "monotonic", lambda: now[0])
+    cache = TTLCache(max_entries=10, ttl_seconds=60)
+
+    cache.set("a", 1)
+    now[0] += 59
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Setting again restarts the clock
+    cache.set("a", 2)
+    now[0] += 30
+    assert cache.get("a") == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(max_entries=3)
+    for key in "abc":
+        cache.set(key, key.upper())
+
+    assert cache.get("a") == "A"
+    cache.set("d", "D")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["A", "C", "D"]
+    assert cache.stats()["entries"] == 3